@@ -1,8 +1,92 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
 import pandas as pd
 import numpy as np
 
 from statsmodels.tsa.arima.model import ARIMA
 
+from analytics.dates import series_freq
+
+ARIMA_ORDER = (1, 1, 1)
+
+# Fitted models kept per process, keyed by series fingerprint
+MODEL_CACHE_SIZE = 256
+
+# Up to this many new months → extend the cached fit without refitting;
+# up to MAX_WARM_START_STEPS → refit starting from the cached parameters
+MAX_APPEND_STEPS = 3
+MAX_WARM_START_STEPS = 12
+
+_model_cache = OrderedDict()
+_model_cache_lock = threading.Lock()
+
+
+def series_fingerprint(series):
+    """
+    Stable hash of a series' index and values.
+    """
+    hashed = pd.util.hash_pandas_object(series, index=True).to_numpy()
+    return hashlib.blake2b(hashed.tobytes(), digest_size=16).hexdigest()
+
+
+def _cache_get(key):
+    with _model_cache_lock:
+        model_fit = _model_cache.get(key)
+        if model_fit is not None:
+            _model_cache.move_to_end(key)
+        return model_fit
+
+
+def _cache_put(key, model_fit):
+    with _model_cache_lock:
+        _model_cache[key] = model_fit
+        _model_cache.move_to_end(key)
+        while len(_model_cache) > MODEL_CACHE_SIZE:
+            _model_cache.popitem(last=False)
+
+
+def fit_arima(series):
+    """
+    ARIMA fit with a model cache.
+
+    Unchanged series reuse their stored fit. When a cached fit exists
+    for the series minus its last few months, the new observations are
+    appended to it (no refit) or, for longer gaps, a fresh fit is
+    warm-started from its parameters.
+    """
+    key = series_fingerprint(series)
+
+    model_fit = _cache_get(key)
+    if model_fit is not None:
+        return model_fit
+
+    for steps in range(1, MAX_WARM_START_STEPS + 1):
+        if len(series) - steps < 6:
+            break
+
+        previous = _cache_get(series_fingerprint(series.iloc[:-steps]))
+        if previous is None:
+            continue
+
+        try:
+            if steps <= MAX_APPEND_STEPS:
+                model_fit = previous.append(series.iloc[-steps:], refit=False)
+            else:
+                model_fit = ARIMA(series, order=ARIMA_ORDER).fit(
+                    start_params=previous.params
+                )
+        except Exception:
+            model_fit = None
+        break
+
+    if model_fit is None:
+        model_fit = ARIMA(series, order=ARIMA_ORDER).fit()
+
+    _cache_put(key, model_fit)
+    return model_fit
+
 
 def arima_forecast(monthly_sales, periods=3):
     """
@@ -18,16 +102,15 @@ def arima_forecast(monthly_sales, periods=3):
         return None
 
     try:
-        # Simple ARIMA(1,1,1) – safe default
-        model = ARIMA(series, order=(1, 1, 1))
-        model_fit = model.fit()
+        # Simple ARIMA(1,1,1) – safe default, cached per series
+        model_fit = fit_arima(series)
 
         forecast = model_fit.forecast(steps=periods)
 
         index = pd.date_range(
             start=series.index[-1],
             periods=periods + 1,
-            freq="ME"
+            freq=series_freq(monthly_sales)
         )[1:]
 
         forecast_df = pd.DataFrame(
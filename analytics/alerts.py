@@ -1,11 +1,12 @@
-def generate_alerts(monthly_sales, forecast_df):
+def generate_alerts(monthly_sales, forecast_df, period="month"):
+    # `period` names one step of the series' grain (day, week, month ...)
     alerts = []
 
     recent_growth = monthly_sales.pct_change().iloc[-1]
 
     if recent_growth < -0.1:
         alerts.append(
-            "🚨 Sales dropped more than 10% in the last month."
+            f"🚨 Sales dropped more than 10% in the last {period}."
         )
 
     last_actual = monthly_sales.iloc[-1]
@@ -13,7 +14,7 @@ def generate_alerts(monthly_sales, forecast_df):
 
     if next_forecast < last_actual:
         alerts.append(
-            "⚠ Forecast indicates a potential decline next month."
+            f"⚠ Forecast indicates a potential decline next {period}."
         )
 
     if not alerts:
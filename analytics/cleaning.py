@@ -1,17 +1,185 @@
+import numpy as np
 import pandas as pd
 
-def clean_sales_data(sales_df):
-    # Remove duplicates
-    sales_df = sales_df.drop_duplicates()
+from analytics.dates import DATE_FORMAT, parse_dates
 
-    # Convert date column
-    sales_df['order_date'] = pd.to_datetime(sales_df['order_date'])
+# Applied in order. Each rule touches only its own column(s).
+CLEANING_RULES = [
+    {"rule": "dedupe", "subset": ["order_id"]},
+    {"rule": "parse_date", "column": "order_date", "format": DATE_FORMAT},
+    {"rule": "clip", "column": "quantity", "lower": 1},
+    {"rule": "clip", "column": "price", "lower": 0},
+    {"rule": "fill", "column": "quantity", "value": 0},
+    {"rule": "fill", "column": "price", "value": 0},
+]
 
-    # Fix invalid values
-    sales_df['quantity'] = sales_df['quantity'].clip(lower=1)
-    sales_df['price'] = sales_df['price'].clip(lower=0)
 
-    # Handle missing values
-    sales_df.fillna(0, inplace=True)
+# --------------------------------------------------
+# RULES: (df, spec) → (df, rows touched)
+# --------------------------------------------------
 
-    return sales_df
+def _dedupe(df, spec):
+    # Key on order_id when present, else on the whole row
+    subset = [c for c in spec["subset"] if c in df.columns] or None
+    duplicated = df.duplicated(subset=subset)
+    touched = int(duplicated.sum())
+
+    if touched:
+        df = df[~duplicated.to_numpy()]
+    return df, touched
+
+
+def _parse_date(df, spec):
+    column = spec["column"]
+    values = df[column]
+
+    # Dates parsed at read time still count, so the report doesn't
+    # depend on how the column was loaded
+    parsed = parse_dates(values, spec["format"])
+    df[column] = parsed
+    return df, int(parsed.notna().sum())
+
+
+def _clip(df, spec):
+    column = spec["column"]
+    values = df[column]
+    # Missing values are left for the fill rules (nullable dtypes give NA here)
+    below = values.lt(spec["lower"]).fillna(False).astype(bool)
+    touched = int(below.sum())
+
+    if touched:
+        df[column] = values.mask(below, spec["lower"])
+    return df, touched
+
+
+def _fill(df, spec):
+    column = spec["column"]
+    values = df[column]
+    missing = values.isna()
+    touched = int(missing.sum())
+
+    if touched:
+        df[column] = values.fillna(spec["value"])
+    return df, touched
+
+
+RULE_FUNCTIONS = {
+    "dedupe": _dedupe,
+    "parse_date": _parse_date,
+    "clip": _clip,
+    "fill": _fill,
+}
+
+
+def run_cleaning(sales_df, rules=CLEANING_RULES):
+    """
+    Apply cleaning rules column by column.
+
+    Works on a shallow copy, so the caller's frame (or slice) is never
+    written to; only columns a rule actually changes are reallocated.
+    Returns the cleaned frame and one report entry per rule.
+    """
+    df = sales_df.copy(deep=False)
+    report = []
+
+    for spec in rules:
+        column = spec.get("column")
+        if column is not None and column not in df.columns:
+            continue
+
+        df, touched = RULE_FUNCTIONS[spec["rule"]](df, spec)
+        report.append(
+            {
+                "rule": spec["rule"],
+                "column": column or ",".join(spec.get("subset", [])),
+                "rows_touched": touched,
+            }
+        )
+
+    return df, report
+
+
+def clean_sales_data(sales_df, report=None):
+    """
+    Clean sales rows. Pass a list as `report` to collect per-rule
+    counts of rows touched.
+    """
+    df, rule_report = run_cleaning(sales_df)
+
+    if report is not None:
+        report.extend(rule_report)
+
+    return df
+
+
+def summarize_report(report):
+    """
+    Combine report entries of repeated runs (e.g. one per chunk).
+    """
+    totals = {}
+    for entry in report:
+        key = (entry["rule"], entry["column"])
+        totals[key] = totals.get(key, 0) + entry["rows_touched"]
+
+    return [
+        {"rule": rule, "column": column, "rows_touched": touched}
+        for (rule, column), touched in totals.items()
+    ]
+
+
+# --------------------------------------------------
+# ACROSS CHUNKS
+# --------------------------------------------------
+
+def _order_keys(order_ids):
+    """
+    One 64-bit key per order_id: whole-number ids are their own key, so
+    1001, 1001.0 and "1001" match whatever dtype a chunk was read with;
+    other ids are hashed.
+    """
+    if pd.api.types.is_integer_dtype(order_ids.dtype):
+        return order_ids.to_numpy(dtype="int64").view("uint64")
+
+    numbers = pd.to_numeric(order_ids, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    whole = np.isfinite(numbers) & (numbers == np.round(numbers)) & (np.abs(numbers) < 2**53)
+
+    keys = pd.util.hash_pandas_object(order_ids.astype(str), index=False).to_numpy().copy()
+    keys[whole] = numbers[whole].astype("int64").view("uint64")
+    return keys
+
+
+def _sorted_unique(keys):
+    keys = np.sort(keys)
+    return keys[np.concatenate(([True], keys[1:] != keys[:-1]))] if len(keys) else keys
+
+
+def drop_seen_orders(sales_df, seen):
+    """
+    Drop rows whose order_id appeared in an earlier chunk, then record
+    this chunk's order_ids in `seen` (a list, empty at first).
+
+    `seen` holds a 64-bit key per order (8 bytes each) in a few sorted
+    runs, merged like a binary counter so each lookup stays a handful
+    of binary searches. Non-numeric ids are hashed; a collision (about
+    1 in 10^11 pairs of orders) would drop an order as a duplicate.
+    Returns the filtered frame and the number of rows dropped.
+    """
+    if "order_id" not in sales_df.columns:
+        return sales_df, 0
+
+    keys = _order_keys(sales_df["order_id"])
+
+    repeated = np.zeros(len(keys), dtype=bool)
+    for run in seen:
+        found = np.minimum(np.searchsorted(run, keys), len(run) - 1)
+        repeated |= run[found] == keys
+
+    run = _sorted_unique(keys)
+    while seen and len(seen[-1]) <= len(run):
+        run = _sorted_unique(np.concatenate((seen.pop(), run)))
+    seen.append(run)
+
+    touched = int(repeated.sum())
+    if touched:
+        sales_df = sales_df[~repeated]
+    return sales_df, touched
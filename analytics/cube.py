@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+from analytics.cleaning import clean_sales_data
+from analytics.dates import bucket_sum, date_codes, day_codes
+
+CUBE_DIMENSIONS = ["region", "category"]
+
+
+def build_cube(df):
+    """
+    Pre-aggregate revenue, quantity and order count per
+    (region, category, day). The day grain keeps arbitrary date-range
+    filters exact; `month` is stored alongside for monthly series.
+
+    Rows go through clean_sales_data first (first row per order_id,
+    clip, then fill missing with 0) so totals match run_engine; rows
+    without a valid date have no day cell and are left out.
+    """
+    df = clean_sales_data(df)
+    quantity = df["quantity"]
+    price = df["price"]
+
+    rows = pd.DataFrame(
+        {
+            "region": df["region"],
+            "category": df["category"],
+            # Stored day codes when the frame has them (see add_date_codes)
+            "day": date_codes(df, "day").astype("datetime64[D]").astype("datetime64[us]"),
+            "revenue": quantity.astype("float64") * price.astype("float64"),
+            "quantity": quantity,
+        }
+    ).dropna(subset=["day"])
+
+    cube = (
+        rows.groupby(CUBE_DIMENSIONS + ["day"], dropna=False, observed=True, sort=False)
+        .agg(
+            revenue=("revenue", "sum"),
+            quantity=("quantity", "sum"),
+            orders=("revenue", "size"),
+        )
+        .reset_index()
+    )
+
+    cube["month"] = cube["day"].to_numpy().astype("datetime64[M]").astype("int64")
+    return cube
+
+
+def slice_cube(cube, region="All", category="All", start=None, end=None):
+    """
+    Cells matching the dashboard filters ("All" means no filter).
+    """
+    mask = np.ones(len(cube), dtype=bool)
+
+    if region != "All":
+        mask &= (cube["region"] == region).to_numpy()
+    if category != "All":
+        mask &= (cube["category"] == category).to_numpy()
+    if start is not None:
+        mask &= (cube["day"] >= pd.to_datetime(start)).to_numpy()
+    if end is not None:
+        mask &= (cube["day"] <= pd.to_datetime(end)).to_numpy()
+
+    return cube[mask]
+
+
+def cube_rollups(cells):
+    """
+    Rollup bundle (see app.engine.build_rollups) answered from cube cells.
+
+    Product and customer rankings are not part of the cube; they need
+    row-level data and are left empty here.
+    """
+    monthly = cells.groupby("month")["revenue"].sum()
+    empty = pd.Series([], name="revenue", dtype="float64")
+
+    return {
+        "total_revenue": float(cells["revenue"].sum()),
+        "total_quantity": float(cells["quantity"].sum()),
+        "order_count": int(cells["orders"].sum()),
+        "monthly_sales": pd.Series(
+            monthly.to_numpy(),
+            index=pd.PeriodIndex.from_ordinals(monthly.index.to_numpy(), freq="M"),
+            name="revenue",
+        ),
+        "daily_sales": bucket_sum(day_codes(cells["day"]), cells["revenue"], "day"),
+        "by_product": empty.rename_axis("product_name"),
+        "by_customer": empty.rename_axis("name"),
+        "by_category": cells.groupby("category", observed=True)["revenue"].sum(),
+        "by_region": cells.groupby("region", observed=True)["revenue"].sum(),
+    }
@@ -0,0 +1,183 @@
+import numpy as np
+import pandas as pd
+
+# Known export format; parsing with it is much faster than inference
+DATE_FORMAT = "%Y-%m-%d"
+
+# Code of a missing date (NaT viewed as int64)
+MISSING_CODE = np.iinfo("int64").min
+
+# CONFIG['date_freq'] values → bucket unit. Weeks run Monday–Sunday and
+# are labelled by their Sunday, as resample('W') does.
+FREQ_UNITS = {
+    "D": "day",
+    "W": "week",
+    "W-SUN": "week",
+    "ME": "month",
+    "QE": "quarter",
+    "QE-DEC": "quarter",
+    "YE": "year",
+    "YE-DEC": "year",
+}
+
+# Time hierarchy, finest first; every grain is derived from daily totals
+TIME_GRAINS = ("day", "week", "month", "quarter", "year")
+
+# Column holding each unit's codes in a frame prepared by add_date_codes
+CODE_COLUMNS = {
+    "day": "order_day",
+    "week": "order_week",
+    "month": "order_month",
+}
+
+PANDAS_FREQS = {
+    "day": "D",
+    "week": "W-SUN",
+    "month": "ME",
+    "quarter": "QE-DEC",
+    "year": "YE-DEC",
+}
+
+
+def freq_unit(freq):
+    try:
+        return FREQ_UNITS[freq]
+    except KeyError:
+        raise ValueError(f"Unsupported date_freq {freq!r}; use one of {sorted(FREQ_UNITS)}") from None
+
+
+def series_freq(series, default="ME"):
+    """
+    Frequency of a period-labelled series (e.g. for forecast indexes).
+    """
+    return getattr(series.index, "freq", None) or default
+
+
+def parse_dates(values, format=DATE_FORMAT):
+    """
+    Parse once with the known format, falling back to inference;
+    unparseable values become NaT.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+
+    try:
+        return pd.to_datetime(values, format=format)
+    except (ValueError, TypeError):
+        return pd.to_datetime(values, errors="coerce")
+
+
+# --------------------------------------------------
+# INTEGER CODES
+# --------------------------------------------------
+
+def day_codes(dates):
+    """
+    Days since 1970-01-01 (MISSING_CODE for NaT).
+    """
+    return np.asarray(dates, dtype="datetime64[us]").astype("datetime64[D]").astype("int64")
+
+
+def period_codes(days, unit):
+    """
+    Day codes → codes of `unit`. Weeks count Mondays since 1969-12-29;
+    months, quarters and years are period ordinals (since 1970).
+    """
+    days = np.asarray(days, dtype="int64")
+    missing = days == MISSING_CODE
+
+    if unit == "day":
+        return days
+    if unit == "week":
+        codes = (days + 3) // 7
+    elif unit in ("month", "quarter", "year"):
+        codes = days.astype("datetime64[D]").astype("datetime64[M]").astype("int64")
+        codes //= {"month": 1, "quarter": 3, "year": 12}[unit]
+    else:
+        raise ValueError(f"Unknown date unit {unit!r}")
+
+    codes[missing] = MISSING_CODE
+    return codes
+
+
+def period_labels(codes, unit, consecutive=False):
+    """
+    Timestamp labelling each code: the day itself, the week's Sunday,
+    or the last day of the month / quarter / year. Consecutive codes
+    get the unit's pandas freq on the index.
+    """
+    codes = np.asarray(codes, dtype="int64")
+
+    if unit == "day":
+        days = codes.astype("datetime64[D]")
+    elif unit == "week":
+        days = (codes * 7 + 3).astype("datetime64[D]")
+    elif unit in ("month", "quarter", "year"):
+        months = {"month": 1, "quarter": 3, "year": 12}[unit]
+        next_start = ((codes + 1) * months).astype("datetime64[M]")
+        days = next_start.astype("datetime64[D]") - np.timedelta64(1, "D")
+    else:
+        raise ValueError(f"Unknown date unit {unit!r}")
+
+    freq = PANDAS_FREQS[unit] if consecutive else None
+    return pd.DatetimeIndex(days.astype("datetime64[us]"), freq=freq)
+
+
+def add_date_codes(df, column="order_date"):
+    """
+    Parse `column` once and store day, week and month codes next to it,
+    so later series and filters never re-parse or resample.
+    """
+    df[column] = parse_dates(df[column])
+    days = day_codes(df[column])
+
+    for unit, code_column in CODE_COLUMNS.items():
+        df[code_column] = period_codes(days, unit)
+
+    return df
+
+
+def date_codes(df, unit, column="order_date"):
+    """
+    Stored codes when present, else computed from the stored day codes
+    (or, failing that, the date column).
+    """
+    code_column = CODE_COLUMNS.get(unit)
+    if code_column in df.columns:
+        return df[code_column].to_numpy()
+    if CODE_COLUMNS["day"] in df.columns:
+        return period_codes(df[CODE_COLUMNS["day"]].to_numpy(), unit)
+    return period_codes(day_codes(parse_dates(df[column])), unit)
+
+
+# --------------------------------------------------
+# SERIES
+# --------------------------------------------------
+
+def bucket_sum(codes, values, unit, name="revenue"):
+    """
+    Dense series of `values` summed per period code with np.bincount;
+    periods between the first and last with no data are 0.
+    """
+    codes = np.asarray(codes, dtype="int64")
+    values = np.nan_to_num(np.asarray(values, dtype="float64"))
+
+    valid = codes != MISSING_CODE
+    codes = codes[valid]
+
+    if len(codes) == 0:
+        index = pd.DatetimeIndex([], dtype="datetime64[us]", name="order_date")
+        return pd.Series([], index=index, name=name, dtype="float64")
+
+    first = codes.min()
+    totals = np.bincount(codes - first, weights=values[valid])
+
+    index = period_labels(np.arange(first, first + len(totals)), unit, consecutive=True)
+    return pd.Series(totals, index=index.rename("order_date"), name=name)
+
+
+def rebucket(series, unit):
+    """
+    Re-aggregate a day-labelled series (e.g. daily totals) to `unit`.
+    """
+    return bucket_sum(period_codes(day_codes(series.index), unit), series.to_numpy(), unit, series.name)
@@ -14,15 +14,28 @@ def safe_number(value, default=0.0):
         return default
 
 
-def executive_decision_engine(df, monthly_sales, growth_rate):
+def executive_decision_engine(df, monthly_sales, growth_rate, rollups=None):
     decisions = {}
 
     # ------------------------------------------------
-    # Ensure revenue exists
+    # Totals: precomputed rollups, else from df
     # ------------------------------------------------
-    if "revenue" not in df.columns:
-        df = df.copy()
-        df["revenue"] = df["quantity"] * df["price"]
+    if rollups is not None:
+        total_revenue = rollups["total_revenue"]
+        category_revenue = rollups["by_category"]
+        region_revenue = rollups["by_region"]
+    else:
+        if "revenue" not in df.columns:
+            df = df.copy()
+            df["revenue"] = df["quantity"] * df["price"]
+
+        total_revenue = df["revenue"].sum()
+        category_revenue = df.groupby("category", observed=True)["revenue"].sum()
+
+        if not df.empty and "region" in df.columns:
+            region_revenue = df.groupby("region", observed=True)["revenue"].sum()
+        else:
+            region_revenue = None
 
     # ------------------------------------------------
     # BUSINESS HEALTH SCORE (DEFENSIVE)
@@ -38,10 +51,8 @@ def executive_decision_engine(df, monthly_sales, growth_rate):
     )
     consistency_score = min(max(revenue_consistency * 0.4, 0), 30)
 
-    total_revenue = safe_number(df["revenue"].sum(), default=1.0)
-    top_category_revenue = safe_number(
-        df.groupby("category")["revenue"].sum().max()
-    )
+    total_revenue = safe_number(total_revenue, default=1.0)
+    top_category_revenue = safe_number(category_revenue.max())
 
     concentration_ratio = safe_number(
         top_category_revenue / total_revenue
@@ -88,21 +99,16 @@ def executive_decision_engine(df, monthly_sales, growth_rate):
     # ------------------------------------------------
     recommendations = []
 
-    if not df.empty and "region" in df.columns:
-        region_revenue = (
-            df.groupby("region")["revenue"].sum()
-        )
-
-        if not region_revenue.empty:
-            top_region = region_revenue.idxmax()
-            weak_region = region_revenue.idxmin()
+    if region_revenue is not None and not region_revenue.empty:
+        top_region = region_revenue.idxmax()
+        weak_region = region_revenue.idxmin()
 
-            recommendations.append(
-                f"Invest more in {top_region} region where revenue is strongest."
-            )
-            recommendations.append(
-                f"Improve performance in {weak_region} region via targeted initiatives."
-            )
+        recommendations.append(
+            f"Invest more in {top_region} region where revenue is strongest."
+        )
+        recommendations.append(
+            f"Improve performance in {weak_region} region via targeted initiatives."
+        )
 
     if concentration_ratio > 0.65:
         recommendations.append(
@@ -1,7 +1,22 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
 import numpy as np
 import pandas as pd
 
 from analytics.advanced_forecast import arima_forecast
+from analytics.dates import (
+    MISSING_CODE,
+    date_codes,
+    day_codes,
+    freq_unit,
+    period_codes,
+    period_labels,
+    series_freq,
+)
 
 
 def smart_forecast(monthly_sales, periods=3):
@@ -44,7 +59,7 @@ def forecast_sales(monthly_sales, periods=3):
         index = pd.date_range(
             start=monthly_sales.index[-1] if len(monthly_sales) else pd.Timestamp.today(),
             periods=periods + 1,
-            freq="ME"
+            freq=series_freq(monthly_sales)
         )[1:]
 
         return pd.DataFrame(
@@ -88,7 +103,7 @@ def forecast_sales(monthly_sales, periods=3):
     index = pd.date_range(
         start=series.index[-1],
         periods=periods + 1,
-        freq="ME"
+        freq=series_freq(monthly_sales)
     )[1:]
 
     return pd.DataFrame(
@@ -99,3 +114,271 @@ def forecast_sales(monthly_sales, periods=3):
         },
         index=index,
     )
+
+
+# --------------------------------------------------
+# BATCH FORECASTING (SEGMENTS)
+# --------------------------------------------------
+
+def segment_series(df, by, freq="ME"):
+    """
+    Wide frame of revenue per `freq` period (a CONFIG['date_freq']
+    value): one column per segment of `by` (a column name or list of
+    names), periods with no sales as 0.
+    """
+    unit = freq_unit(freq)
+    revenue = df["revenue"] if "revenue" in df.columns else df["quantity"] * df["price"]
+
+    codes = date_codes(df, unit)
+    valid = codes != MISSING_CODE
+
+    wide = (
+        df[valid].assign(revenue=revenue[valid], period=codes[valid])
+        .pivot_table(
+            index="period",
+            columns=by,
+            values="revenue",
+            aggfunc="sum",
+            fill_value=0,
+            observed=True,
+        )
+        .sort_index()
+    )
+
+    periods = np.arange(wide.index.min(), wide.index.max() + 1)
+    wide = wide.reindex(periods, fill_value=0)
+    wide.index = period_labels(periods, unit, consecutive=True)
+    return wide
+
+
+def _series_label(label):
+    if isinstance(label, tuple):
+        return " × ".join(str(part) for part in label)
+    return label
+
+
+def _stop_pool(pool):
+    """
+    Shut a pool down without waiting on its fits. A running call can't
+    be cancelled, so the workers are terminated first (a hung ARIMA fit
+    would otherwise keep running and block interpreter exit).
+    """
+    if hasattr(pool, "terminate_workers"):  # Python 3.14+
+        pool.terminate_workers()
+        return
+
+    # Older versions have no public handle on the workers: _processes is
+    # the only list that also holds workers still starting up (tracking
+    # PIDs from an initializer misses those, and they'd be left running)
+    processes = list((pool._processes or {}).values())
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.join()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def batch_forecast(series, periods=3, max_workers=None, timeout=30):
+    """
+    Forecast many series at once across a process pool.
+
+    `series` is a dict of label → monthly Series, or a wide DataFrame
+    (one column per series, e.g. from segment_series). Each fit uses
+    smart_forecast; a fit that fails or runs longer than `timeout`
+    seconds falls back to the baseline forecast, and its worker is
+    terminated.
+
+    Returns one frame indexed by (series, date) with a `model` column.
+    """
+    if isinstance(series, pd.DataFrame):
+        series = {label: series[label] for label in series.columns}
+
+    if not series:
+        return pd.DataFrame(
+            columns=["forecast", "lower_bound", "upper_bound", "model"],
+            index=pd.MultiIndex.from_tuples([], names=["series", "date"]),
+        )
+
+    max_workers = max_workers or os.cpu_count() or 1
+    results = {}
+
+    if max_workers == 1:
+        for label, values in series.items():
+            results[label] = smart_forecast(values, periods)
+    else:
+        workers = min(max_workers, len(series))
+        queue = deque(series)
+        running = {}  # future → (label, start time)
+        pool = ProcessPoolExecutor(max_workers=workers)
+
+        def baseline(label):
+            return forecast_sales(series[label], periods), "Baseline"
+
+        try:
+            while queue or running:
+                # At most one fit per worker, so a fit starts when submitted
+                # and its deadline counts fitting time, not time in the queue
+                while queue and len(running) < workers:
+                    label = queue.popleft()
+                    future = pool.submit(smart_forecast, series[label], periods)
+                    running[future] = (label, time.monotonic())
+
+                next_deadline = min(start for _, start in running.values()) + timeout
+                done, _ = wait(
+                    running,
+                    timeout=max(next_deadline - time.monotonic(), 0),
+                    return_when=FIRST_COMPLETED,
+                )
+
+                broken = False
+                for future in done:
+                    label, _ = running.pop(future)
+                    try:
+                        results[label] = future.result()
+                    except Exception as exc:
+                        # Crashed worker or fit error → baseline
+                        broken = broken or isinstance(exc, BrokenProcessPool)
+                        results[label] = baseline(label)
+
+                now = time.monotonic()
+                overdue = [
+                    future for future, (_, start) in running.items()
+                    if now - start >= timeout
+                ]
+                for future in overdue:
+                    label, _ = running.pop(future)
+                    results[label] = baseline(label)
+
+                if overdue or broken:
+                    # Kill the stuck workers; fits still within their
+                    # deadline are lost with them and start over
+                    _stop_pool(pool)
+                    queue.extendleft(reversed([label for label, _ in running.values()]))
+                    running = {}
+                    pool = ProcessPoolExecutor(max_workers=workers)
+        finally:
+            _stop_pool(pool)
+
+    frames = []
+    labels = []
+
+    for label in series:
+        forecast_df, model_used = results[label]
+        frames.append(forecast_df.assign(model=model_used))
+        labels.append(_series_label(label))
+
+    return pd.concat(frames, keys=labels, names=["series", "date"])
+
+
+
+# --------------------------------------------------
+# VECTORIZED BASELINE (THOUSANDS OF SERIES)
+# --------------------------------------------------
+
+def forecast_sales_batch(values, index=None, labels=None, periods=3):
+    """
+    forecast_sales() for many series in one vectorized NumPy pass.
+
+    `values` is a 2-D array (series × months) with NaN for missing
+    months, plus the period-end `index` of its columns (its freq sets
+    the grain; month-end when unset) and optional series `labels`.
+    A wide DataFrame (months × series, as returned by segment_series)
+    can be passed instead.
+
+    Per series, the same rules as forecast_sales apply: fewer than two
+    points → last value (±10%), zero variance → mean of the last three
+    points, otherwise a least-squares linear trend (±15%).
+
+    Returns a tidy frame indexed by (series, date) with a `method` column.
+    """
+    if isinstance(values, pd.DataFrame):
+        index, labels = values.index, values.columns
+        values = values.to_numpy(dtype="float64").T
+
+    y = np.asarray(values, dtype="float64")
+    if y.ndim != 2:
+        raise ValueError("values must be a 2-D array (series × months)")
+
+    n_series, n_months = y.shape
+    labels = np.arange(n_series) if labels is None else np.asarray(labels, dtype=object)
+
+    # -------------------------------
+    # VALID POINTS (like dropna)
+    # -------------------------------
+    valid = ~np.isnan(y)
+    n = valid.sum(axis=1)
+    y0 = np.where(valid, y, 0.0)
+
+    # x = position within the series' own valid points
+    x = np.cumsum(valid, axis=1) - 1
+    from_end = n[:, None] - 1 - x
+
+    safe_n = np.maximum(n, 1)
+
+    last_value = np.where(valid & (from_end == 0), y0, 0.0).sum(axis=1)
+    # Forecast dates continue from the last valid month (or, like
+    # forecast_sales, from the series end when it has < 2 points)
+    last_col = np.where(n >= 2, np.argmax(valid & (from_end == 0), axis=1), n_months - 1)
+
+    # -------------------------------
+    # LINEAR TREND (CLOSED FORM)
+    # -------------------------------
+    mean_y = y0.sum(axis=1) / safe_n
+    variance = np.where(valid, (y0 - mean_y[:, None]) ** 2, 0.0).sum(axis=1) / safe_n
+
+    sx = n * (n - 1) / 2.0
+    sxx = (n - 1) * n * (2 * n - 1) / 6.0
+    sy = y0.sum(axis=1)
+    sxy = np.where(valid, x * y0, 0.0).sum(axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = (n * sxy - sx * sy) / (n * sxx - sx ** 2)
+        intercept = (sy - slope * sx) / n
+
+    future_x = n[:, None] + np.arange(periods)[None, :]
+    trend = slope[:, None] * future_x + intercept[:, None]
+
+    # -------------------------------
+    # FALLBACKS
+    # -------------------------------
+    last_three = valid & (from_end < 3)
+    rolling_mean = np.where(last_three, y0, 0.0).sum(axis=1) / np.maximum(np.minimum(n, 3), 1)
+
+    too_short = n < 2
+    use_rolling = ~too_short & ((variance == 0) | ~np.isfinite(trend).all(axis=1))
+
+    forecast = np.where(
+        too_short[:, None],
+        last_value[:, None],
+        np.where(use_rolling[:, None], rolling_mean[:, None], trend),
+    )
+    forecast = np.broadcast_to(forecast, (n_series, periods))
+
+    band = np.where(too_short, 0.1, 0.15)[:, None]
+    method = np.where(too_short, "last_value", np.where(use_rolling, "rolling_mean", "trend"))
+
+    # -------------------------------
+    # FUTURE PERIOD-END DATES
+    # -------------------------------
+    if index is None:
+        index = pd.date_range(pd.Timestamp.today(), periods=n_months, freq="ME")
+
+    # Period codes are consecutive integers at every grain
+    index = pd.DatetimeIndex(index)
+    unit = freq_unit(index.freqstr or "ME")
+    start_codes = period_codes(day_codes(index), unit)[last_col]
+    future_codes = start_codes[:, None] + np.arange(1, periods + 1)[None, :]
+    dates = period_labels(future_codes.ravel(), unit)
+
+    return pd.DataFrame(
+        {
+            "forecast": forecast.ravel(),
+            "lower_bound": (forecast * (1 - band)).ravel(),
+            "upper_bound": (forecast * (1 + band)).ravel(),
+            "method": np.repeat(method, periods),
+        },
+        index=pd.MultiIndex.from_arrays(
+            [np.repeat(labels, periods), dates],
+            names=["series", "date"],
+        ),
+    )
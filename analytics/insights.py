@@ -1,19 +1,40 @@
-def generate_insights(monthly_sales, growth_rate, df):
+import pandas as pd
+
+from analytics.dates import freq_unit
+
+# How a period of each date_freq unit is named in insights
+PERIOD_NAMES = {
+    "day": ("day", "%d %B %Y"),
+    "week": ("week", "week ending %d %B %Y"),
+    "month": ("month", "%B %Y"),
+    "quarter": ("quarter", "quarter ending %B %Y"),
+    "year": ("year", "%Y"),
+}
+
+
+def generate_insights(monthly_sales, growth_rate, df, rollups=None, freq="ME"):
     insights = []
+    period, label_format = PERIOD_NAMES[freq_unit(freq)]
 
     # ------------------------------------------------
     # SAFE GROWTH INSIGHT
     # ------------------------------------------------
-    valid_growth = growth_rate.dropna()
-
-    if len(valid_growth) == 0:
+    if len(growth_rate) < 2:
         insights.append(
             "ℹ️ Not enough historical data to calculate growth trends."
         )
     else:
-        latest_growth = valid_growth.iloc[-1]
+        latest_growth = growth_rate.iloc[-1]
 
-        if latest_growth > 0:
+        if pd.isna(latest_growth):
+            # Growth after an empty period is undefined (see analyze_series);
+            # report the absolute change rather than an older period's rate
+            insights.append(
+                f"ℹ️ Revenue went from {monthly_sales.iloc[-2]:,.2f} to "
+                f"{monthly_sales.iloc[-1]:,.2f} in the latest {period} "
+                f"(growth undefined after a {period} with no sales)."
+            )
+        elif latest_growth > 0:
             insights.append(
                 f"📈 Revenue increased by {latest_growth:.2f}% in the latest period."
             )
@@ -23,22 +44,31 @@ def generate_insights(monthly_sales, growth_rate, df):
             )
 
     # ------------------------------------------------
-    # BEST MONTH INSIGHT
+    # BEST PERIOD INSIGHT
     # ------------------------------------------------
     if not monthly_sales.empty:
-        best_month = monthly_sales.idxmax().strftime("%B %Y")
-        insights.append(f"🏆 Best performing month: {best_month}.")
+        best_period = monthly_sales.idxmax().strftime(label_format)
+        insights.append(f"🏆 Best performing {period}: {best_period}.")
 
     # ------------------------------------------------
     # CATEGORY & REGION DRIVER
     # ------------------------------------------------
+    if rollups is not None:
+        top_category = rollups["by_category"].idxmax()
+        top_region = rollups["by_region"].idxmax()
+
+        insights.append(
+            f"💡 Top revenue driver: {top_category} category in {top_region} region."
+        )
+        return insights
+
     if "revenue" not in df.columns:
         df = df.copy()
         df["revenue"] = df["quantity"] * df["price"]
 
     if "category" in df.columns and "region" in df.columns:
-        top_category = df.groupby("category")["revenue"].sum().idxmax()
-        top_region = df.groupby("region")["revenue"].sum().idxmax()
+        top_category = df.groupby("category", observed=True)["revenue"].sum().idxmax()
+        top_region = df.groupby("region", observed=True)["revenue"].sum().idxmax()
 
         insights.append(
             f"💡 Top revenue driver: {top_category} category in {top_region} region."
@@ -1,23 +1,32 @@
 import numpy as np
 
-def calculate_kpis(df):
+from analytics.topk import top_n as select_top
+
+def calculate_kpis(df, rollups=None, top_n=None):
+    # Only the `top_n` best products/customers are ranked (None = all)
+
+    # Precomputed rollups → no scan of df needed
+    if rollups is not None:
+        order_count = rollups["order_count"]
+
+        return {
+            "total_revenue": rollups["total_revenue"],
+            "avg_order_value": (
+                rollups["total_revenue"] / order_count if order_count else 0.0
+            ),
+            "top_products": select_top(rollups["by_product"], top_n),
+            "top_customers": select_top(rollups["by_customer"], top_n),
+        }
+
     # Revenue column
     df['revenue'] = df['quantity'] * df['price']
 
     total_revenue = np.sum(df['revenue'])
     avg_order_value = np.mean(df['revenue'])
 
-    top_products = (
-        df.groupby('product_name')['revenue']
-        .sum()
-        .sort_values(ascending=False)
-    )
-
-    top_customers = (
-        df.groupby('name')['revenue']
-        .sum()
-        .sort_values(ascending=False)
-    )
+    top_products = select_top(df.groupby('product_name', observed=True)['revenue'].sum(), top_n)
+
+    top_customers = select_top(df.groupby('name', observed=True)['revenue'].sum(), top_n)
 
     return {
         "total_revenue": total_revenue,
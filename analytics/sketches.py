@@ -0,0 +1,422 @@
+import base64
+import math
+
+import numpy as np
+import pandas as pd
+
+from analytics.cleaning import clean_sales_data
+
+# Sketch sizes: memory per (month, region, category) cell is fixed,
+# whatever the number of rows, customers or products behind it.
+HLL_PRECISION = 12  # 4096 registers → ±1.6% distinct count
+KLL_K = 200  # ≈ ±0.8% rank error on quantiles
+CMS_WIDTH = 512  # overestimate ≤ e / width of the total weight …
+CMS_DEPTH = 4  # … with probability 1 - e^-depth
+HEAVY_HITTER_CANDIDATES = 32
+
+QUANTILES = [0.5, 0.9, 0.95, 0.99]
+
+
+def _hash(values):
+    """
+    Stable 64-bit hashes of arbitrary labels.
+    """
+    return pd.util.hash_array(np.asarray(values, dtype=object))
+
+
+def _bit_length(x):
+    """
+    Bit length of each uint64 (exact: each 32-bit half fits a float64).
+    """
+    high = (x >> np.uint64(32)).astype("float64")
+    low = (x & np.uint64(0xFFFFFFFF)).astype("float64")
+    return np.where(high > 0, 32 + np.frexp(high)[1], np.frexp(low)[1])
+
+
+def _encode(array):
+    return {"dtype": str(array.dtype), "shape": list(array.shape), "data": base64.b64encode(array.tobytes()).decode("ascii")}
+
+
+def _decode(data):
+    array = np.frombuffer(base64.b64decode(data["data"]), dtype=data["dtype"])
+    return array.reshape(data["shape"]).copy()
+
+
+# --------------------------------------------------
+# HYPERLOGLOG: distinct counts
+# --------------------------------------------------
+
+def hll_new(precision=HLL_PRECISION):
+    return {"precision": precision, "registers": np.zeros(1 << precision, dtype=np.uint8)}
+
+
+def hll_add(sketch, values):
+    p = sketch["precision"]
+    hashes = _hash(values)
+
+    buckets = (hashes >> np.uint64(64 - p)).astype(np.int64)
+    rest = hashes << np.uint64(p)
+    rank = np.minimum(64 - _bit_length(rest), 64 - p) + 1
+
+    np.maximum.at(sketch["registers"], buckets, rank.astype(np.uint8))
+    return sketch
+
+
+def hll_merge(left, right):
+    return {
+        "precision": left["precision"],
+        "registers": np.maximum(left["registers"], right["registers"]),
+    }
+
+
+def hll_count(sketch):
+    """
+    (estimate, standard error) of the number of distinct values.
+    """
+    registers = sketch["registers"]
+    m = len(registers)
+    alpha = 0.7213 / (1 + 1.079 / m)
+
+    estimate = alpha * m * m / np.sum(np.ldexp(1.0, -registers.astype(np.int64)))
+
+    zeros = int(np.count_nonzero(registers == 0))
+    if estimate <= 2.5 * m and zeros:
+        estimate = m * math.log(m / zeros)  # linear counting for small sets
+
+    return estimate, estimate * 1.04 / math.sqrt(m)
+
+
+# --------------------------------------------------
+# KLL: quantiles
+# --------------------------------------------------
+# Level h holds items of weight 2**h. An over-full level is sorted and
+# every other item (alternating offset) is promoted to the next level.
+
+def kll_new(k=KLL_K):
+    return {"k": k, "levels": [np.empty(0)], "n": 0, "compactions": 0}
+
+
+def _kll_capacity(k, level, depth):
+    return max(2, int(math.ceil(k * (2 / 3) ** (depth - 1 - level))))
+
+
+def _kll_compress(sketch):
+    levels = sketch["levels"]
+    k = sketch["k"]
+
+    while True:
+        depth = len(levels)
+        over = [
+            h for h in range(depth)
+            if len(levels[h]) > _kll_capacity(k, h, depth)
+        ]
+        if not over:
+            return sketch
+
+        h = over[0]
+        items = np.sort(levels[h])
+        keep = items[-1:] if len(items) % 2 else items[:0]
+        pairs = items[: len(items) - len(keep)]
+
+        offset = sketch["compactions"] % 2
+        sketch["compactions"] += 1
+
+        if h + 1 == depth:
+            levels.append(np.empty(0))
+        levels[h] = keep
+        levels[h + 1] = np.concatenate([levels[h + 1], pairs[offset::2]])
+
+
+def kll_add(sketch, values):
+    values = np.asarray(values, dtype="float64")
+    values = values[~np.isnan(values)]
+
+    sketch["levels"][0] = np.concatenate([sketch["levels"][0], values])
+    sketch["n"] += len(values)
+    return _kll_compress(sketch)
+
+
+def kll_merge(left, right):
+    depth = max(len(left["levels"]), len(right["levels"]))
+    levels = [
+        np.concatenate([
+            left["levels"][h] if h < len(left["levels"]) else np.empty(0),
+            right["levels"][h] if h < len(right["levels"]) else np.empty(0),
+        ])
+        for h in range(depth)
+    ]
+
+    merged = {
+        "k": min(left["k"], right["k"]),
+        "levels": levels,
+        "n": left["n"] + right["n"],
+        "compactions": left["compactions"] + right["compactions"],
+    }
+    return _kll_compress(merged)
+
+
+def kll_quantiles(sketch, quantiles=QUANTILES):
+    """
+    (values, rank error): approximate quantiles and the normalized rank
+    error bound they carry.
+    """
+    if sketch["n"] == 0:
+        return np.full(len(quantiles), np.nan), 0.0
+
+    items = np.concatenate(sketch["levels"])
+    weights = np.concatenate([
+        np.full(len(level), 2.0 ** h) for h, level in enumerate(sketch["levels"])
+    ])
+
+    order = np.argsort(items, kind="stable")
+    items = items[order]
+    ranks = np.cumsum(weights[order]) / weights.sum()
+
+    positions = np.searchsorted(ranks, np.asarray(quantiles), side="left")
+    return items[np.minimum(positions, len(items) - 1)], 1.65 / sketch["k"]
+
+
+# --------------------------------------------------
+# COUNT-MIN: heavy hitters
+# --------------------------------------------------
+
+def cms_new(width=CMS_WIDTH, depth=CMS_DEPTH, candidates=HEAVY_HITTER_CANDIDATES):
+    return {
+        "table": np.zeros((depth, width)),
+        "total": 0.0,
+        "capacity": candidates,
+        "candidates": [],
+    }
+
+
+def _cms_columns(sketch, labels):
+    # Double hashing: row i uses h1 + i * h2
+    hashes = _hash(labels)
+    h1 = (hashes & np.uint64(0xFFFFFFFF)).astype(np.int64)
+    h2 = (hashes >> np.uint64(32)).astype(np.int64) | 1
+
+    depth, width = sketch["table"].shape
+    return [(h1 + i * h2) % width for i in range(depth)]
+
+
+def cms_estimate(sketch, labels):
+    columns = _cms_columns(sketch, labels)
+    table = sketch["table"]
+    return np.min([table[i, cols] for i, cols in enumerate(columns)], axis=0)
+
+
+def _cms_keep_candidates(sketch, labels):
+    labels = pd.unique(np.asarray(list(sketch["candidates"]) + list(labels), dtype=object))
+    if len(labels) == 0:
+        return sketch
+
+    estimates = pd.Series(cms_estimate(sketch, labels), index=labels)
+    sketch["candidates"] = estimates.nlargest(sketch["capacity"]).index.tolist()
+    return sketch
+
+
+def cms_add(sketch, labels, weights):
+    totals = pd.Series(np.asarray(weights, dtype="float64"), index=np.asarray(labels, dtype=object))
+    totals = totals[totals.index.notna()].groupby(level=0, sort=False).sum()
+
+    for i, cols in enumerate(_cms_columns(sketch, totals.index)):
+        np.add.at(sketch["table"][i], cols, totals.to_numpy())
+
+    sketch["total"] += float(totals.sum())
+    return _cms_keep_candidates(sketch, totals.index)
+
+
+def cms_merge(left, right):
+    merged = {
+        "table": left["table"] + right["table"],
+        "total": left["total"] + right["total"],
+        "capacity": min(left["capacity"], right["capacity"]),
+        "candidates": list(left["candidates"]),
+    }
+    return _cms_keep_candidates(merged, right["candidates"])
+
+
+def cms_heavy_hitters(sketch, n=10):
+    """
+    Top `n` candidates by estimated weight, with the additive error bound.
+    """
+    labels = list(sketch["candidates"])
+    estimates = pd.Series(cms_estimate(sketch, labels) if labels else [], index=labels, dtype="float64")
+
+    width = sketch["table"].shape[1]
+    return estimates.nlargest(n), math.e / width * sketch["total"]
+
+
+# --------------------------------------------------
+# PER-CELL SKETCHES
+# --------------------------------------------------
+
+def _new_cell():
+    return {"customers": hll_new(), "order_value": kll_new(), "products": cms_new()}
+
+
+def merge_cells(left, right):
+    return {
+        "customers": hll_merge(left["customers"], right["customers"]),
+        "order_value": kll_merge(left["order_value"], right["order_value"]),
+        "products": cms_merge(left["products"], right["products"]),
+    }
+
+
+def build_sketches(df):
+    """
+    Sketches per (month ordinal, region, category): distinct customers,
+    order value quantiles and heavy-hitter products by revenue.
+
+    Rows go through clean_sales_data first, as in build_cube, so
+    duplicate orders are counted once.
+    """
+    df = clean_sales_data(df)
+    revenue = (
+        df["quantity"].astype("float64")
+        * df["price"].astype("float64")
+    )
+    order_date = df["order_date"].to_numpy()
+    valid = ~np.isnat(order_date)
+
+    rows = pd.DataFrame(
+        {
+            "month": order_date[valid].astype("datetime64[M]").astype("int64"),
+            "region": df["region"].to_numpy()[valid],
+            "category": df["category"].to_numpy()[valid],
+            "customer_id": df["customer_id"].to_numpy()[valid],
+            "product_name": df["product_name"].to_numpy()[valid],
+            "revenue": revenue.to_numpy()[valid],
+        }
+    )
+
+    cells = {}
+    for key, group in rows.groupby(["month", "region", "category"], dropna=False, observed=True, sort=True):
+        cell = _new_cell()
+        hll_add(cell["customers"], group["customer_id"].dropna().to_numpy())
+        kll_add(cell["order_value"], group["revenue"].to_numpy())
+        cms_add(cell["products"], group["product_name"].to_numpy(), group["revenue"].to_numpy())
+        cells[key] = cell
+
+    return cells
+
+
+def merge_sketch_sets(left, right):
+    """
+    Combine two cell maps, e.g. built from different files or chunks.
+    """
+    merged = dict(left)
+    for key, cell in right.items():
+        merged[key] = merge_cells(merged[key], cell) if key in merged else cell
+    return merged
+
+
+def approximate_kpis(cells, region="All", category="All", start=None, end=None, top_n=10):
+    """
+    Answer the dashboard filters from sketches alone. Dates are applied
+    at month grain (the cells' resolution).
+
+    Every value comes with its error bound: standard error for distinct
+    counts, normalized rank error for quantiles, additive bound for
+    heavy-hitter revenue.
+    """
+    first = None if start is None else np.datetime64(pd.Timestamp(start), "M").astype("int64")
+    last = None if end is None else np.datetime64(pd.Timestamp(end), "M").astype("int64")
+
+    by_month = {}
+    for (month, cell_region, cell_category), cell in cells.items():
+        if region != "All" and cell_region != region:
+            continue
+        if category != "All" and cell_category != category:
+            continue
+        if (first is not None and month < first) or (last is not None and month > last):
+            continue
+        by_month[month] = merge_cells(by_month[month], cell) if month in by_month else cell
+
+    if not by_month:
+        return None
+
+    overall = None
+    monthly_rows = []
+    for month in sorted(by_month):
+        cell = by_month[month]
+        overall = cell if overall is None else merge_cells(overall, cell)
+        estimate, error = hll_count(cell["customers"])
+        monthly_rows.append({"estimate": estimate, "error": error})
+
+    unique_by_month = pd.DataFrame(
+        monthly_rows,
+        index=pd.PeriodIndex.from_ordinals(sorted(by_month), freq="M").to_timestamp(how="end").normalize(),
+    )
+
+    values, rank_error = kll_quantiles(overall["order_value"])
+    heavy, heavy_error = cms_heavy_hitters(overall["products"], top_n)
+
+    return {
+        "unique_customers": hll_count(overall["customers"]),
+        "unique_customers_by_month": unique_by_month,
+        "order_value_quantiles": pd.DataFrame(
+            {"value": values, "rank_error": rank_error},
+            index=pd.Index(QUANTILES, name="quantile"),
+        ),
+        "heavy_hitters": pd.DataFrame(
+            {"revenue": heavy, "error": heavy_error},
+        ).rename_axis("product_name"),
+    }
+
+
+# --------------------------------------------------
+# SERIALIZATION
+# --------------------------------------------------
+
+def sketches_to_dict(cells):
+    """
+    JSON-serializable form of a cell map (arrays as base64).
+    """
+    return [
+        {
+            "key": [int(month), region, category],
+            "customers": {
+                "precision": cell["customers"]["precision"],
+                "registers": _encode(cell["customers"]["registers"]),
+            },
+            "order_value": {
+                "k": cell["order_value"]["k"],
+                "n": cell["order_value"]["n"],
+                "compactions": cell["order_value"]["compactions"],
+                "levels": [_encode(level) for level in cell["order_value"]["levels"]],
+            },
+            "products": {
+                "table": _encode(cell["products"]["table"]),
+                "total": cell["products"]["total"],
+                "capacity": cell["products"]["capacity"],
+                "candidates": list(cell["products"]["candidates"]),
+            },
+        }
+        for (month, region, category), cell in cells.items()
+    ]
+
+
+def sketches_from_dict(data):
+    cells = {}
+    for entry in data:
+        customers, order_value, products = entry["customers"], entry["order_value"], entry["products"]
+        cells[tuple(entry["key"])] = {
+            "customers": {
+                "precision": customers["precision"],
+                "registers": _decode(customers["registers"]),
+            },
+            "order_value": {
+                "k": order_value["k"],
+                "n": order_value["n"],
+                "compactions": order_value["compactions"],
+                "levels": [_decode(level) for level in order_value["levels"]],
+            },
+            "products": {
+                "table": _decode(products["table"]),
+                "total": products["total"],
+                "capacity": products["capacity"],
+                "candidates": list(products["candidates"]),
+            },
+        }
+    return cells
@@ -1,11 +1,21 @@
-def time_series_analysis(df):
-    df = df.set_index('order_date')
+import numpy as np
 
-    # FIX: use 'ME' instead of 'M'
-    monthly_sales = df['revenue'].resample('ME').sum()
-    growth_rate = monthly_sales.pct_change() * 100
+from analytics.dates import TIME_GRAINS, rebucket
 
-    best_month = monthly_sales.idxmax()
-    worst_month = monthly_sales.idxmin()
 
-    return monthly_sales, growth_rate, best_month, worst_month
+def time_hierarchy(daily_sales, grains=TIME_GRAINS):
+    """
+    Revenue series for every grain in `grains`, each re-bucketed from
+    the daily totals rather than from raw rows.
+    """
+    return {unit: rebucket(daily_sales, unit) for unit in grains}
+
+
+def analyze_series(series):
+    """
+    Growth rate (%) and best/worst period of a revenue series at any grain.
+    Growth after an empty period is undefined (NaN), not inf.
+    """
+    growth_rate = (series.pct_change() * 100).replace([np.inf, -np.inf], np.nan)
+    return series, growth_rate, series.idxmax(), series.idxmin()
+
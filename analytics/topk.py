@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+
+
+def top_n(totals, n=None):
+    """
+    The `n` largest totals, descending, by partial selection instead of
+    a full sort. Ties keep label order. n=None returns everything.
+    """
+    if n is None or n >= len(totals):
+        return totals.sort_values(ascending=False, kind="stable")
+    if n <= 0:
+        return totals.iloc[:0]
+
+    # argpartition finds the n-th largest value; only entries at or
+    # above it are sorted
+    values = totals.to_numpy(dtype="float64")
+    threshold = values[np.argpartition(-values, n - 1)[n - 1]]
+    candidates = totals[values >= threshold]
+
+    return candidates.sort_values(ascending=False, kind="stable").iloc[:n]
+
+
+# --------------------------------------------------
+# MERGEABLE TOP-K SKETCH
+# --------------------------------------------------
+# Keeps the `capacity` largest per-key totals seen so far. `floor` is an
+# upper bound on the total of any key not kept, so after merges a kept
+# key's count may overestimate its true total by at most its `errors`
+# entry. With capacity >= number of keys the sketch is exact.
+
+def topk_sketch(totals, capacity):
+    """
+    Sketch of exact per-key totals (e.g. one chunk's rollup).
+    """
+    ranked = top_n(totals, capacity + 1)
+    counts = ranked.iloc[:capacity]
+
+    return {
+        "capacity": capacity,
+        "counts": counts,
+        "errors": pd.Series(0.0, index=counts.index, name="error"),
+        "floor": float(ranked.iloc[capacity]) if len(ranked) > capacity else 0.0,
+    }
+
+
+def merge_topk(left, right):
+    """
+    Combine two sketches. Keys missing from one side are charged that
+    side's floor, so counts stay upper bounds.
+    """
+    capacity = min(left["capacity"], right["capacity"])
+    keys = left["counts"].index.union(right["counts"].index)
+
+    def side(sketch, part):
+        return sketch[part].reindex(keys, fill_value=sketch["floor"])
+
+    counts = side(left, "counts") + side(right, "counts")
+    errors = side(left, "errors") + side(right, "errors")
+
+    ranked = top_n(counts.rename("revenue"), capacity + 1)
+    kept = ranked.iloc[:capacity]
+
+    floor = left["floor"] + right["floor"]
+    if len(ranked) > capacity:
+        floor = max(floor, float(ranked.iloc[capacity]))
+
+    return {
+        "capacity": capacity,
+        "counts": kept,
+        "errors": errors.reindex(kept.index).rename("error"),
+        "floor": floor,
+    }
+
+
+def topk_items(sketch, n=None):
+    """
+    Estimated top `n` totals and their maximum overestimate.
+    """
+    counts = top_n(sketch["counts"], n)
+    return counts, sketch["errors"].reindex(counts.index)
+
+
+def topk_to_dict(sketch):
+    """
+    JSON-serializable form (labels become strings).
+    """
+    return {
+        "capacity": sketch["capacity"],
+        "floor": sketch["floor"],
+        "counts": {str(k): float(v) for k, v in sketch["counts"].items()},
+        "errors": {str(k): float(v) for k, v in sketch["errors"].items()},
+    }
+
+
+def topk_from_dict(data, name=None):
+    labels = pd.Index(list(data["counts"]), name=name)
+
+    return {
+        "capacity": data["capacity"],
+        "floor": data["floor"],
+        "counts": pd.Series(list(data["counts"].values()), index=labels, name="revenue", dtype="float64"),
+        "errors": pd.Series(
+            [data["errors"][k] for k in data["counts"]], index=labels, name="error", dtype="float64"
+        ),
+    }
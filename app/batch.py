@@ -0,0 +1,320 @@
+import csv
+import json
+import math
+import os
+import re
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+from analytics.decisions import executive_decision_engine
+from analytics.forecasting import smart_forecast
+from app.duckdb_backend import run_engine_duckdb
+from app.engine import run_engine, run_engine_streaming
+from app.incremental import STATE_FILE, run_engine_incremental
+from app.ingest_cache import load_cached_data
+from app.instrument import Profiler
+from app.loader import is_sharded, load_csv_data
+
+SUMMARY_FILE = "summary.json"
+
+# Tenant names become directory names under the output and cache roots
+TENANT_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+
+# Worker processes are replaced after this many tenants, so memory held
+# by one large dataset is returned to the OS
+TASKS_PER_WORKER = 10
+
+# Share of a worker's memory cap given to DuckDB's buffer pool; the rest
+# covers the interpreter, pandas and DuckDB's own overhead, so DuckDB
+# spills to disk before the worker hits its address-space limit
+DUCKDB_MEMORY_SHARE = 0.5
+
+
+# --------------------------------------------------
+# ONE DATASET
+# --------------------------------------------------
+
+def run_dataset(paths, config, profiler=None, state_path=STATE_FILE):
+    """
+    Run the engine on one dataset with the backend/load mode in `config`.
+    `state_path` is only used by incremental mode.
+    """
+    if profiler is None:
+        profiler = Profiler(track_memory=config["profile_memory"])
+
+    if config["backend"] == "duckdb":
+        return run_engine_duckdb(paths, config, profiler)
+    if config["load_mode"] == "stream":
+        return run_engine_streaming(paths, config, profiler)
+    if config["load_mode"] == "incremental":
+        if config["date_range"]:
+            raise ValueError("Incremental mode does not support a date range (start/end).")
+        return run_engine_incremental(paths, config, state_path, profiler)
+
+    # The columnar cache keys whole files; shards and date ranges load directly
+    if config["ingest_cache"] and not is_sharded(paths["sales"]) and not config["date_range"]:
+        data = load_cached_data(paths, profiler=profiler)
+    else:
+        with profiler.stage("load_csv") as stage:
+            data = load_csv_data(paths, config["date_range"], config["ingest_workers"])
+            stage["rows_out"] = len(data["sales"])
+
+    return run_engine(data, config, profiler)
+
+
+# --------------------------------------------------
+# MANIFEST
+# --------------------------------------------------
+
+def check_tenant_name(tenant):
+    """
+    Reject names that could escape the output directory (../x, /abs ...).
+    """
+    if not TENANT_PATTERN.match(tenant):
+        raise ValueError(
+            f"Invalid tenant name {tenant!r}: use letters, digits, '_' and '-' only"
+        )
+    return tenant
+
+
+def load_manifest(path):
+    """
+    Tenants to process: a JSON list (or {"tenants": [...]}) or a CSV with
+    columns tenant, sales, customers, products and optional start, end.
+    Relative paths are resolved against the manifest's directory.
+    """
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            entries = list(csv.DictReader(f))
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        if isinstance(entries, dict):
+            entries = entries["tenants"]
+
+    base = os.path.dirname(os.path.abspath(path))
+    tenants = []
+    seen = set()
+
+    for entry in entries:
+        tenant = check_tenant_name(str(entry["tenant"]))
+        if tenant in seen:
+            raise ValueError(f"Duplicate tenant {tenant!r} in manifest")
+        seen.add(tenant)
+
+        tenants.append(
+            {
+                "tenant": tenant,
+                "paths": {
+                    name: os.path.join(base, entry[name])
+                    for name in ("sales", "customers", "products")
+                },
+                "start": entry.get("start") or None,
+                "end": entry.get("end") or None,
+            }
+        )
+
+    return tenants
+
+
+# --------------------------------------------------
+# OUTPUTS
+# --------------------------------------------------
+
+def _atomic_write(path, write):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def series_to_json(series):
+    """
+    {period: value} with ISO dates and NaN as null.
+    """
+    return {
+        str(label.date()) if hasattr(label, "date") else str(label): (
+            None if math.isnan(value) else float(value)
+        )
+        for label, value in series.items()
+    }
+
+
+def write_json(path, payload):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def write(tmp_path):
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, default=str, indent=4)
+
+    _atomic_write(path, write)
+
+
+def write_tenant_outputs(directory, results, decisions, forecast_df, model_used):
+    """
+    Parquet tables first, report.json last: a tenant whose report.json
+    exists has a complete, consistent set of outputs.
+    """
+    os.makedirs(directory, exist_ok=True)
+    kpis = results["kpis"]
+
+    tables = {
+        "monthly_sales": results["monthly_sales"].rename("revenue").to_frame(),
+        "forecast": forecast_df,
+        "top_products": kpis["top_products"].to_frame(),
+        "top_customers": kpis["top_customers"].to_frame(),
+    }
+    for name, frame in tables.items():
+        _atomic_write(
+            os.path.join(directory, f"{name}.parquet"),
+            lambda tmp_path, frame=frame: frame.to_parquet(tmp_path),
+        )
+
+    write_json(
+        os.path.join(directory, "report.json"),
+        {
+            "kpis": {
+                "total_revenue": float(kpis["total_revenue"]),
+                "avg_order_value": float(kpis["avg_order_value"]),
+            },
+            "growth": series_to_json(results["growth"]),
+            "insights": results["insights"],
+            "decisions": decisions,
+            "model_used": model_used,
+            "cleaning": results.get("cleaning", []),
+            "profile": results["profile"],
+        },
+    )
+
+
+# --------------------------------------------------
+# WORKERS
+# --------------------------------------------------
+
+def _limit_memory(max_mb):
+    """
+    Cap a worker's address space; a tenant that needs more fails with
+    MemoryError instead of starving the others.
+    """
+    if max_mb and resource is not None:
+        limit = int(max_mb) * 2**20
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def worker_config(config, worker_memory_mb):
+    """
+    CONFIG for tenant workers: no nested process pools (shard loading
+    runs in the worker itself) and a DuckDB memory limit under the cap.
+    """
+    config = dict(config, ingest_workers=1)
+    if worker_memory_mb:
+        config["duckdb_memory_limit"] = f"{int(worker_memory_mb * DUCKDB_MEMORY_SHARE)}MB"
+    return config
+
+
+def run_tenant(tenant, config, output_dir):
+    """
+    Engine, decisions and forecast for one tenant. Never raises:
+    failures are returned in the summary record.
+    """
+    started = time.perf_counter()
+    record = {"tenant": tenant["tenant"], "status": "ok", "seconds": 0.0, "error": None}
+
+    try:
+        config = dict(config)
+        if tenant["start"] or tenant["end"]:
+            config["date_range"] = (tenant["start"], tenant["end"])
+
+        state_path = os.path.join(".cache", "tenants", tenant["tenant"], "engine_state.json")
+        results = run_dataset(tenant["paths"], config, state_path=state_path)
+        decisions = executive_decision_engine(
+            None, results["monthly_sales"], results["growth"], rollups=results["rollups"]
+        )
+        forecast_df, model_used = smart_forecast(results["monthly_sales"])
+
+        write_tenant_outputs(
+            os.path.join(output_dir, tenant["tenant"]), results, decisions, forecast_df, model_used
+        )
+    except Exception as exc:
+        record["status"] = "failed"
+        record["error"] = f"{type(exc).__name__}: {exc}"
+        record["traceback"] = traceback.format_exc()
+
+    record["seconds"] = time.perf_counter() - started
+    return record
+
+
+def run_batch(tenants, config, output_dir, max_workers=None, worker_memory_mb=None):
+    """
+    Process tenants in a pool of worker processes, each capped at
+    `worker_memory_mb`. Returns one summary record per tenant, in
+    manifest order; also written to <output_dir>/summary.json.
+    """
+    for tenant in tenants:
+        check_tenant_name(tenant["tenant"])
+
+    os.makedirs(output_dir, exist_ok=True)
+    started = time.perf_counter()
+    config = worker_config(config, worker_memory_mb)
+
+    pool_options = {}
+    if sys.version_info >= (3, 11):  # max_tasks_per_child is new in 3.11
+        pool_options["max_tasks_per_child"] = TASKS_PER_WORKER
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_limit_memory,
+        initargs=(worker_memory_mb,),
+        **pool_options,
+    ) as pool:
+        futures = [pool.submit(run_tenant, tenant, config, output_dir) for tenant in tenants]
+
+        records = []
+        for tenant, future in zip(tenants, futures):
+            try:
+                records.append(future.result())
+            except Exception as exc:
+                # The worker itself died (e.g. killed by the OS)
+                records.append(
+                    {
+                        "tenant": tenant["tenant"],
+                        "status": "failed",
+                        "seconds": None,
+                        "error": f"{type(exc).__name__}: {exc}",
+                    }
+                )
+
+    summary = {
+        "seconds": time.perf_counter() - started,
+        "tenants": len(records),
+        "failed": sum(record["status"] != "ok" for record in records),
+        "records": records,
+    }
+    write_json(os.path.join(output_dir, SUMMARY_FILE), summary)
+    return summary
+
+
+def format_summary(summary):
+    lines = [f"{'tenant':<24} {'status':<8} {'seconds':>9}  error"]
+
+    for record in summary["records"]:
+        seconds = "—" if record["seconds"] is None else f"{record['seconds']:.2f}"
+        lines.append(
+            f"{record['tenant']:<24} {record['status']:<8} {seconds:>9}  {record['error'] or ''}"
+        )
+
+    lines.append(
+        f"\n{summary['tenants']} tenants, {summary['failed']} failed, "
+        f"{summary['seconds']:.2f} s total"
+    )
+    return "\n".join(lines)
@@ -1,7 +1,24 @@
 CONFIG = {
     "currency": "INR",
-    "date_freq": "ME",
+    "date_freq": "ME",  # D | W | ME | QE | YE; results_at_grain switches later
     "top_n": 5,
+    "topk_capacity": None,  # stream/incremental rankings kept per key (None = exact)
     "enable_insights": True,
     "report_format": "console",  # console | json | file
+    "backend": "pandas",  # pandas | duckdb (out-of-core queries over the CSVs)
+    "duckdb_memory_limit": "4GB",  # duckdb backend spills to disk past this
+    "load_mode": "memory",  # memory | stream | incremental
+    "chunk_size": 500_000,  # rows per chunk in stream mode
+    "date_range": None,  # (start, end) ISO dates; prunes sales partitions
+    "ingest_workers": None,  # processes parsing sales shards (None = CPU count)
+    "join_strategy": "codes",  # codes (star-schema lookups) | merge
+    "ingest_cache": True,  # columnar cache of parsed CSVs (needs pyarrow)
+    "profile_memory": False,  # per-stage peak memory (tracemalloc, slower)
+    "profile_path": "reports/engine_profile.json",  # main.py stage profile dump
+    "cache_max_mb": 512,  # dashboard result cache memory budget
+    "cache_max_entries": 128,
+    "batch_output_dir": "reports/tenants",  # main.py --manifest outputs
+    "batch_workers": None,  # tenant worker processes (None = CPU count)
+    "batch_worker_memory_mb": 2048,  # address-space cap per tenant worker (0 = none)
+    "ui_workers": 4,  # dashboard threads running decisions/forecast in the background
 }
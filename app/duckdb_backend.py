@@ -0,0 +1,289 @@
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+try:
+    import duckdb
+except ImportError:  # pragma: no cover - optional dependency
+    duckdb = None
+
+from analytics.dates import bucket_sum
+from app.engine import ROLLUP_KEYS, results_from_rollups
+from app.instrument import Profiler
+from app.loader import is_sharded, resolve_sales_files
+
+# Spill directories (one per connection, removed on close) for sorts,
+# joins and temp tables that exceed memory_limit
+SPILL_DIR = os.path.join(".cache", "duckdb")
+
+# Keys and dates are read as text so every shard (and both sides of a
+# join) agree on their type; dates are cast after filtering.
+SALES_TYPES = {"order_date": "VARCHAR", "customer_id": "VARCHAR", "product_id": "VARCHAR"}
+CUSTOMER_TYPES = {"customer_id": "VARCHAR"}
+PRODUCT_TYPES = {"product_id": "VARCHAR"}
+
+
+# --------------------------------------------------
+# QUERIES
+# --------------------------------------------------
+
+def _read_csv(files, types):
+    """
+    read_csv(...) table function over one or more files.
+    """
+    file_list = ", ".join("'" + f.replace("'", "''") + "'" for f in files)
+    type_list = ", ".join(f"'{column}': '{kind}'" for column, kind in types.items())
+    return f"read_csv([{file_list}], header = true, union_by_name = true, types = {{{type_list}}})"
+
+
+def _date_filter(date_range):
+    if date_range is None:
+        return "TRUE"
+
+    start, end = date_range
+    clauses = ["TRY_CAST(order_date AS TIMESTAMP) IS NOT NULL"]
+    if start is not None:
+        clauses.append(f"TRY_CAST(order_date AS TIMESTAMP) >= TIMESTAMP '{pd.Timestamp(start)}'")
+    if end is not None:
+        end = pd.Timestamp(end) + pd.Timedelta(days=1)
+        clauses.append(f"TRY_CAST(order_date AS TIMESTAMP) < TIMESTAMP '{end}'")
+    return " AND ".join(clauses)
+
+
+# Raw sales with their position in the input: the file's index in the
+# list and the row's ordinal across all files (both follow file order,
+# unlike rowid once scans and inserts run in parallel)
+READ_SALES = """
+CREATE TEMP TABLE raw_sales AS
+SELECT * EXCLUDE (ordinality), file_index, ordinality AS source_row
+FROM {source} WITH ORDINALITY
+WHERE {date_filter}
+"""
+
+# Same rules as analytics.cleaning.CLEANING_RULES, in the same order:
+# keep the first row per order_id in file order, parse dates (NULL when
+# unparseable, like NaT), clip, then fill.
+CLEAN_SALES = """
+CREATE TEMP TABLE sales AS
+SELECT
+    TRY_CAST(order_date AS TIMESTAMP) AS order_date,
+    customer_id,
+    product_id,
+    CAST(quantity AS DOUBLE) AS raw_quantity,
+    CAST(price AS DOUBLE) AS raw_price,
+    COALESCE(CASE WHEN quantity < 1 THEN 1 ELSE quantity END, 0)::DOUBLE
+        * COALESCE(CASE WHEN price < 0 THEN 0 ELSE price END, 0)::DOUBLE AS revenue
+FROM raw_sales
+QUALIFY row_number() OVER (PARTITION BY order_id ORDER BY file_index, source_row) = 1
+"""
+
+CLEANING_COUNTS = """
+SELECT
+    (SELECT count(*) FROM raw_sales) - count(*) AS dedupe,
+    count(order_date) AS parse_date,
+    count_if(raw_quantity < 1) AS clip_quantity,
+    count_if(raw_price < 0) AS clip_price,
+    count_if(raw_quantity IS NULL) AS fill_quantity,
+    count_if(raw_price IS NULL) AS fill_price
+FROM sales
+"""
+
+JOIN_FACT = """
+CREATE TEMP TABLE fact AS
+SELECT
+    datediff('day', TIMESTAMP '1970-01-01', s.order_date) AS day,
+    (year(s.order_date) - 1970) * 12 + month(s.order_date) - 1 AS month,
+    s.revenue,
+    c.name,
+    c.region,
+    p.product_name,
+    p.category
+FROM sales s
+JOIN customers c ON s.customer_id = c.customer_id
+JOIN products p ON s.product_id = p.product_id
+"""
+
+# One scan for every rollup; GROUPING() tells the sets apart since
+# labels themselves may be NULL.
+ROLLUP_QUERY = """
+SELECT
+    GROUPING(day, month, product_name, name, category, region) AS grouping_id,
+    day, month, product_name, name, category, region,
+    sum(revenue) AS revenue,
+    count(*) AS orders
+FROM fact
+GROUP BY GROUPING SETS ((), (day), (month), (product_name), (name), (category), (region))
+"""
+
+# GROUPING() bit masks: the set's own column is the only 0 bit
+GROUPING_IDS = {
+    "total": 0b111111,
+    "daily_sales": 0b011111,
+    "monthly_sales": 0b101111,
+    "product_name": 0b110111,
+    "name": 0b111011,
+    "category": 0b111101,
+    "region": 0b111110,
+}
+
+
+# --------------------------------------------------
+# RESULT SHAPING
+# --------------------------------------------------
+
+def _monthly_series(rows):
+    """
+    Dense monthly revenue on a PeriodIndex, as engine._sum_by_month builds.
+    """
+    rows = rows[rows["month"].notna()]
+
+    if rows.empty:
+        return pd.Series([], index=pd.PeriodIndex([], freq="M"), name="revenue", dtype="float64")
+
+    months = rows["month"].to_numpy(dtype="int64")
+    first = months.min()
+    totals = np.zeros(months.max() - first + 1)
+    totals[months - first] = rows["revenue"].to_numpy(dtype="float64")
+
+    index = pd.PeriodIndex.from_ordinals(np.arange(first, first + len(totals)), freq="M")
+    return pd.Series(totals, index=index, name="revenue")
+
+
+def _daily_series(rows):
+    rows = rows[rows["day"].notna()]
+    return bucket_sum(rows["day"].to_numpy(dtype="int64"), rows["revenue"].to_numpy(dtype="float64"), "day")
+
+
+def _key_series(rows, column):
+    rows = rows[rows[column].notna()].sort_values(column, kind="stable")
+    return pd.Series(
+        rows["revenue"].to_numpy(dtype="float64"),
+        index=pd.Index(rows[column].tolist(), name=column),
+        name="revenue",
+    )
+
+
+def rollups_from_grouping_sets(grouped):
+    """
+    Split the GROUPING SETS result into the engine's rollup bundle.
+    """
+    sets = {
+        name: grouped[grouped["grouping_id"] == grouping_id]
+        for name, grouping_id in GROUPING_IDS.items()
+    }
+    total = sets["total"]
+
+    rollups = {
+        "total_revenue": float(total["revenue"].fillna(0).sum()),
+        "order_count": int(total["orders"].sum()),
+        "monthly_sales": _monthly_series(sets["monthly_sales"]),
+        "daily_sales": _daily_series(sets["daily_sales"]),
+    }
+
+    for key, column in ROLLUP_KEYS.items():
+        rollups[key] = _key_series(sets[column], column)
+
+    return rollups
+
+
+def _cleaning_report(counts):
+    return [
+        {"rule": "dedupe", "column": "order_id", "rows_touched": int(counts["dedupe"])},
+        {"rule": "parse_date", "column": "order_date", "rows_touched": int(counts["parse_date"])},
+        {"rule": "clip", "column": "quantity", "rows_touched": int(counts["clip_quantity"])},
+        {"rule": "clip", "column": "price", "rows_touched": int(counts["clip_price"])},
+        {"rule": "fill", "column": "quantity", "rows_touched": int(counts["fill_quantity"])},
+        {"rule": "fill", "column": "price", "rows_touched": int(counts["fill_price"])},
+    ]
+
+
+# --------------------------------------------------
+# ENTRY POINT
+# --------------------------------------------------
+
+@contextmanager
+def connect(config):
+    """
+    DuckDB connection that spills past CONFIG['duckdb_memory_limit'] to
+    its own directory under SPILL_DIR, so concurrent processes never
+    share spill files. The directory is removed when the block exits.
+    """
+    if duckdb is None:
+        raise ImportError("The duckdb backend needs the duckdb package (pip install duckdb).")
+
+    os.makedirs(SPILL_DIR, exist_ok=True)
+    spill_dir = tempfile.mkdtemp(prefix=f"{os.getpid()}-", dir=SPILL_DIR)
+    try:
+        conn = duckdb.connect(
+            config={
+                "memory_limit": config["duckdb_memory_limit"],
+                "temp_directory": spill_dir,
+            }
+        )
+        try:
+            yield conn
+        finally:
+            conn.close()
+    finally:
+        shutil.rmtree(spill_dir, ignore_errors=True)
+
+
+def run_engine_duckdb(paths, config, profiler=None):
+    """
+    run_engine over the CSV files themselves, as DuckDB queries.
+
+    Cleaning, the star join and every rollup run out of core (spilling
+    to disk when over the memory limit); only the small rollup results
+    come back into pandas, so the analytics modules are reused as is.
+    Cleaning keeps the same rows as the pandas path (the first row per
+    order_id in file order; unparseable dates become NULL, like NaT),
+    so totals match it up to floating-point summation order.
+    """
+    if profiler is None:
+        profiler = Profiler(track_memory=config["profile_memory"])
+
+    sales = paths["sales"]
+    files = resolve_sales_files(sales, config["date_range"]) if is_sharded(sales) else [sales]
+    if not files:
+        raise FileNotFoundError(f"No sales CSV files found for {sales!r}")
+
+    with connect(config) as conn:
+        with profiler.stage("read_sales") as stage:
+            conn.execute(
+                READ_SALES.format(
+                    source=_read_csv(files, SALES_TYPES),
+                    date_filter=_date_filter(config["date_range"]),
+                )
+            )
+            stage["rows_out"] = conn.execute("SELECT count(*) FROM raw_sales").fetchone()[0]
+
+        with profiler.stage("clean", rows_in=stage["rows_out"]) as stage:
+            conn.execute(CLEAN_SALES)
+            counts = conn.execute(CLEANING_COUNTS).df().iloc[0]
+            stage["rows_out"] = conn.execute("SELECT count(*) FROM sales").fetchone()[0]
+
+        with profiler.stage("join", rows_in=stage["rows_out"]) as stage:
+            conn.execute(
+                f"CREATE TEMP VIEW customers AS SELECT * FROM {_read_csv([paths['customers']], CUSTOMER_TYPES)}"
+            )
+            conn.execute(
+                f"CREATE TEMP VIEW products AS SELECT * FROM {_read_csv([paths['products']], PRODUCT_TYPES)}"
+            )
+            conn.execute(JOIN_FACT)
+            stage["rows_out"] = conn.execute("SELECT count(*) FROM fact").fetchone()[0]
+
+        with profiler.stage("rollups", rows_in=stage["rows_out"]) as stage:
+            rollups = rollups_from_grouping_sets(conn.execute(ROLLUP_QUERY).df())
+            stage["rows_out"] = rollups["order_count"]
+
+    if rollups["order_count"] == 0:
+        raise ValueError("No sales rows matched customers and products.")
+
+    results = results_from_rollups(rollups, config, profiler)
+    results["cleaning"] = _cleaning_report(counts)
+    results["profile"] = profiler.report()
+    return results
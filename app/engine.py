@@ -1,27 +1,375 @@
-from analytics.cleaning import clean_sales_data
+import numpy as np
+import pandas as pd
+
+from analytics.cleaning import clean_sales_data, drop_seen_orders, summarize_report
+from analytics.dates import bucket_sum, day_codes, freq_unit
 from analytics.kpis import calculate_kpis
-from analytics.time_analysis import time_series_analysis
+from analytics.time_analysis import analyze_series, time_hierarchy
 from analytics.insights import generate_insights
+from analytics.topk import merge_topk, topk_sketch
+from app.instrument import Profiler
+from app.loader import iter_sales_chunks
+from app.schema import CATEGORY_DTYPES, conform_keys, shared_key_rows
+
+ROLLUP_KEYS = {
+    "by_product": "product_name",
+    "by_customer": "name",
+    "by_category": "category",
+    "by_region": "region",
+}
+
+# Per-key rankings that can be bounded by CONFIG['topk_capacity']
+RANKING_KEYS = ("by_product", "by_customer")
+
+
+def run_engine(data, config, profiler=None):
+    if profiler is None:
+        profiler = Profiler(track_memory=config["profile_memory"])
+
+    cleaning_report = []
+
+    with profiler.stage("clean", rows_in=len(data["sales"])) as stage:
+        sales = clean_sales_data(data["sales"], report=cleaning_report)
+        stage["rows_out"] = len(sales)
+
+    customers, products = data["customers"], data["products"]
+
+    if config["join_strategy"] == "codes" and dimensions_are_unique(customers, products):
+        with profiler.stage("star_join_rollups", rows_in=len(sales)) as stage:
+            rollups = build_star_rollups(sales, customers, products)
+            stage["rows_out"] = rollups["order_count"]
+    else:
+        with profiler.stage("merge", rows_in=len(sales)) as stage:
+            df = (
+                sales
+                .merge(customers, on="customer_id")
+                .merge(products, on="product_id")
+            )
+            stage["rows_out"] = len(df)
+
+        with profiler.stage("rollups", rows_in=len(df)) as stage:
+            rollups = build_rollups(df)
+            stage["rows_out"] = rollups["order_count"]
+
+    results = results_from_rollups(rollups, config, profiler)
+    results["cleaning"] = summarize_report(cleaning_report)
+    results["profile"] = profiler.report()
+    return results
 
-def run_engine(data, config):
-    sales = clean_sales_data(data["sales"])
 
-    df = (
-        sales
-        .merge(data["customers"], on="customer_id")
-        .merge(data["products"], on="product_id")
+# --------------------------------------------------
+# FUSED AGGREGATION
+# --------------------------------------------------
+
+def _revenue(df):
+    return (
+        df["quantity"].to_numpy(dtype="float64", na_value=0)
+        * df["price"].to_numpy(dtype="float64", na_value=0)
+    )
+
+
+def _key_codes(keys):
+    """
+    Integer codes and sorted labels for a key column.
+    Categoricals reuse their codes instead of hashing strings.
+    """
+    if isinstance(keys.dtype, pd.CategoricalDtype):
+        return keys.cat.codes.to_numpy(), keys.cat.categories
+    return pd.factorize(keys, sort=True)
+
+
+def _sum_by_codes(codes, labels, revenue, name):
+    """
+    Revenue per key via integer codes + np.bincount (no hash groupby).
+    """
+    valid = codes >= 0
+    codes = codes[valid]
+
+    totals = np.bincount(codes, weights=revenue[valid], minlength=len(labels))
+    observed = np.bincount(codes, minlength=len(labels)) > 0
+
+    return pd.Series(
+        totals[observed],
+        index=pd.Index(labels[observed], name=name),
+        name="revenue",
     )
 
-    kpis = calculate_kpis(df)
-    monthly, growth, best, worst = time_series_analysis(df)
+
+def _sum_by_month(order_date, revenue):
+    """
+    Revenue per calendar month, dense from first to last month.
+    Months are period ordinals (months since 1970-01), so empty months
+    are filled by bincount's minlength.
+    """
+    valid = ~np.isnat(order_date)
+
+    if not valid.any():
+        return pd.Series([], index=pd.PeriodIndex([], freq="M"), name="revenue", dtype="float64")
+
+    months = order_date[valid].astype("datetime64[M]").astype("int64")
+    first = months.min()
+    totals = np.bincount(months - first, weights=revenue[valid])
+
+    index = pd.PeriodIndex.from_ordinals(np.arange(first, first + len(totals)), freq="M")
+    return pd.Series(totals, index=index, name="revenue")
+
+
+def _sum_by_day(order_date, revenue):
+    """
+    Dense daily revenue; weekly (or other date_freq) series are
+    re-bucketed from it without touching the fact table again.
+    """
+    return bucket_sum(day_codes(order_date), revenue, "day")
+
+
+def build_rollups(df):
+    """
+    Every aggregate the analytics modules need, computed in one pass.
+
+    Revenue is derived once; each dimension is reduced with bincount over
+    its integer codes. Rollups are mergeable with merge_rollups().
+    """
+    revenue = _revenue(df)
+
+    rollups = {
+        "total_revenue": float(revenue.sum()),
+        "order_count": len(df),
+        "monthly_sales": _sum_by_month(df["order_date"].to_numpy(), revenue),
+        "daily_sales": _sum_by_day(df["order_date"].to_numpy(), revenue),
+    }
+
+    for key, column in ROLLUP_KEYS.items():
+        codes, labels = _key_codes(df[column])
+        rollups[key] = _sum_by_codes(codes, labels, revenue, column)
+
+    return rollups
+
+
+# --------------------------------------------------
+# STAR-SCHEMA JOIN (NO MERGE)
+# --------------------------------------------------
+
+def dimensions_are_unique(customers, products):
+    return customers["customer_id"].is_unique and products["product_id"].is_unique
+
+
+def surrogate_keys(sales, dimension, key):
+    """
+    Row position of each sale's record in a dimension table (-1 if absent).
+    """
+    rows = shared_key_rows(sales[key], dimension[key])
+    if rows is not None:
+        return rows
+    return pd.Index(dimension[key]).get_indexer(sales[key]).astype("int32")
+
+
+def build_star_rollups(sales, customers, products):
+    """
+    Same bundle as build_rollups(), without merging dimensions into sales.
+
+    Sales carry integer surrogate keys into the customer/product tables.
+    Each label column is factorized once on its (small) dimension table
+    and gathered through those keys, so no widened fact table is built.
+    Unmatched sales are dropped, as with an inner merge.
+    """
+    fact_keys = {
+        "customers": surrogate_keys(sales, customers, "customer_id"),
+        "products": surrogate_keys(sales, products, "product_id"),
+    }
+    dimensions = {"customers": customers, "products": products}
+
+    matched = (fact_keys["customers"] >= 0) & (fact_keys["products"] >= 0)
+    revenue = _revenue(sales)[matched]
+
+    order_date = sales["order_date"].to_numpy()[matched]
+
+    rollups = {
+        "total_revenue": float(revenue.sum()),
+        "order_count": int(matched.sum()),
+        "monthly_sales": _sum_by_month(order_date, revenue),
+        "daily_sales": _sum_by_day(order_date, revenue),
+    }
+
+    for key, column in ROLLUP_KEYS.items():
+        name = "customers" if column in customers.columns else "products"
+        dimension_codes, labels = _key_codes(dimensions[name][column])
+        row_codes = dimension_codes[fact_keys[name][matched]]
+        rollups[key] = _sum_by_codes(row_codes, labels, revenue, column)
+
+    return rollups
+
+
+# --------------------------------------------------
+# STREAMING MODE
+# --------------------------------------------------
+
+def merge_rollups(left, right):
+    merged = {
+        "total_revenue": left["total_revenue"] + right["total_revenue"],
+        "order_count": left["order_count"] + right["order_count"],
+    }
+
+    for key in ("monthly_sales", "daily_sales", *ROLLUP_KEYS):
+        if isinstance(left[key], dict):  # bounded top-K sketch
+            merged[key] = merge_topk(left[key], right[key])
+        else:
+            merged[key] = left[key].add(right[key], fill_value=0)
+
+    return merged
+
+
+def bound_rankings(rollups, capacity):
+    """
+    Replace product/customer totals with top-K sketches so merged
+    rollups stay bounded by `capacity` keys (None keeps them exact).
+    """
+    if capacity is None:
+        return rollups
+
+    rollups = dict(rollups)
+    for key in RANKING_KEYS:
+        rollups[key] = topk_sketch(rollups[key], capacity)
+    return rollups
+
+
+def settle_rankings(rollups):
+    """
+    Turn top-K sketches back into ranked Series; their per-key
+    overestimate bounds go to rollups['ranking_errors'].
+    """
+    if not any(isinstance(rollups[key], dict) for key in RANKING_KEYS):
+        return rollups
+
+    rollups = dict(rollups)
+    rollups["ranking_errors"] = {}
+    for key in RANKING_KEYS:
+        sketch = rollups[key]
+        rollups[key] = sketch["counts"]
+        rollups["ranking_errors"][key] = sketch["errors"]
+    return rollups
+
+
+def results_from_rollups(rollups, config, profiler=None):
+    """
+    Build the run_engine result shape from a rollup bundle.
+    """
+    profiler = profiler or Profiler()
+    rollups = settle_rankings(rollups)
+
+    with profiler.stage("kpis"):
+        kpis = calculate_kpis(None, rollups=rollups, top_n=config["top_n"])
+
+    # Every grain from the daily totals, once; switching grain reads these
+    with profiler.stage("time_hierarchy") as stage:
+        hierarchy = time_hierarchy(rollups["daily_sales"])
+        stage["rows_out"] = len(rollups["daily_sales"])
+
+    results = {"kpis": kpis, "rollups": rollups, "time_hierarchy": hierarchy}
+    return results_at_grain(results, config["date_freq"], config, profiler)
+
+
+def results_at_grain(results, freq, config, profiler=None):
+    """
+    The same results at another date grain (a CONFIG['date_freq'] value).
+
+    Series, growth, best/worst period and insights are recomputed from
+    results["time_hierarchy"] and the rollups; the fact table is not
+    touched. "monthly_sales" holds the series at the chosen grain.
+    """
+    profiler = profiler or Profiler()
+    unit = freq_unit(freq)
+
+    with profiler.stage("time_series") as stage:
+        series, growth, best, worst = analyze_series(results["time_hierarchy"][unit])
+        stage["rows_out"] = len(series)
 
     insights = []
     if config["enable_insights"]:
-        insights = generate_insights(monthly, growth, df)
+        with profiler.stage("insights"):
+            insights = generate_insights(
+                series, growth, None, rollups=results["rollups"], freq=freq
+            )
 
     return {
-        "kpis": kpis,
-        "monthly_sales": monthly,
+        **results,
+        "grain": unit,
+        "monthly_sales": series,
         "growth": growth,
-        "insights": insights
+        "best_period": best,
+        "worst_period": worst,
+        "insights": insights,
     }
+
+
+def run_engine_streaming(paths, config, profiler=None):
+    """
+    Run the engine over sales.csv (or its shards) chunk by chunk.
+
+    Each chunk is cleaned, joined to the (small) customer and product
+    tables (see CONFIG['join_strategy']) and reduced to partial
+    aggregates, so peak memory stays flat regardless of file size
+    (plus 8 bytes per order, to drop orders repeated across chunks).
+    Set CONFIG['topk_capacity'] to bound product/customer rankings.
+    """
+    if profiler is None:
+        profiler = Profiler(track_memory=config["profile_memory"])
+
+    with profiler.stage("read_dimensions"):
+        customers = pd.read_csv(paths["customers"], dtype=CATEGORY_DTYPES)
+        products = pd.read_csv(paths["products"], dtype=CATEGORY_DTYPES)
+
+    star_join = (
+        config["join_strategy"] == "codes"
+        and dimensions_are_unique(customers, products)
+    )
+
+    rollups = None
+    cleaning_report = []
+    seen_orders = []
+    chunks = iter_sales_chunks(paths["sales"], config["chunk_size"], config["date_range"])
+
+    while True:
+        with profiler.stage("read_chunk") as stage:
+            chunk = next(chunks, None)
+            stage["rows_out"] = 0 if chunk is None else len(chunk)
+
+        if chunk is None:
+            break
+
+        with profiler.stage("clean", rows_in=len(chunk)) as stage:
+            # Rows without keys can never join; drop them before cleaning
+            chunk = chunk.dropna(subset=["customer_id", "product_id"])
+            chunk, repeated = drop_seen_orders(chunk, seen_orders)
+            sales = clean_sales_data(chunk, report=cleaning_report)
+            cleaning_report.append(
+                {"rule": "dedupe", "column": "order_id", "rows_touched": repeated}
+            )
+            sales = conform_keys(sales, customers, products)
+            stage["rows_out"] = len(sales)
+
+        with profiler.stage("join_rollups", rows_in=len(sales)) as stage:
+            if star_join:
+                part = build_star_rollups(sales, customers, products)
+            else:
+                df = (
+                    sales
+                    .merge(customers, on="customer_id")
+                    .merge(products, on="product_id")
+                )
+                part = build_rollups(df)
+            part = bound_rankings(part, config["topk_capacity"])
+            stage["rows_out"] = part["order_count"]
+
+        if part["order_count"] == 0:
+            continue
+
+        with profiler.stage("merge_rollups"):
+            rollups = part if rollups is None else merge_rollups(rollups, part)
+
+    if rollups is None:
+        raise ValueError("No sales rows matched customers and products.")
+
+    results = results_from_rollups(rollups, config, profiler)
+    results["cleaning"] = summarize_report(cleaning_report)
+    results["profile"] = profiler.report()
+    return results
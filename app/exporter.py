@@ -1,7 +1,122 @@
+import gzip
+import io
 import json
+import tempfile
 
-def export_csv(df):
-    return df.to_csv(index=False).encode("utf-8")
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    pq = None
+
+# Rows serialized at a time: export memory is one chunk plus the spool,
+# never a copy of the whole frame as text
+EXPORT_CHUNK_ROWS = 100_000
+
+# Exports stay in memory up to this size, then roll over to a temp file
+SPOOL_MAX_BYTES = 16 * 2**20
+
+# zlib's default; level 9 is ~3x slower for about the same size on CSV
+GZIP_LEVEL = 6
+
+# Format → (file extension, mime type)
+EXPORT_FORMATS = {
+    "csv": (".csv", "text/csv"),
+    "csv.gz": (".csv.gz", "application/gzip"),
+    "parquet": (".parquet", "application/vnd.apache.parquet"),
+}
+
+
+# --------------------------------------------------
+# ROW-LEVEL DATA
+# --------------------------------------------------
+
+def _chunks(df, chunk_rows):
+    # An empty frame still yields one (empty) chunk, for the header
+    for start in range(0, max(len(df), 1), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def _spool():
+    return tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES, mode="w+b")
+
+
+def write_csv(df, stream, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Write df as UTF-8 CSV to a binary stream, chunk by chunk.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8", newline="", write_through=True)
+    try:
+        for i, chunk in enumerate(_chunks(df, chunk_rows)):
+            chunk.to_csv(text, index=False, header=i == 0)
+    finally:
+        text.detach()  # leave `stream` open for the caller
+
+
+def write_parquet(df, stream, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Write df as Parquet to a binary stream, one row group per chunk.
+    """
+    if pq is None:
+        raise ImportError("Parquet export needs the pyarrow package (pip install pyarrow).")
+
+    # Schema of the whole frame, so an all-null chunk can't change a type
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+
+    with pq.ParquetWriter(stream, schema) as writer:
+        for chunk in _chunks(df, chunk_rows):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+def export_csv(df, compress=False, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    CSV (gzip-compressed when `compress`) in a spooled temp file,
+    rewound and ready to read. The caller closes it.
+    """
+    spool = _spool()
+
+    if compress:
+        # mtime=0 keeps the output identical for identical data
+        with gzip.GzipFile(fileobj=spool, mode="wb", compresslevel=GZIP_LEVEL, mtime=0) as stream:
+            write_csv(df, stream, chunk_rows)
+    else:
+        write_csv(df, spool, chunk_rows)
+
+    spool.seek(0)
+    return spool
+
+
+def export_parquet(df, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Parquet in a spooled temp file, rewound and ready to read.
+    """
+    spool = _spool()
+    write_parquet(df, spool, chunk_rows)
+    spool.seek(0)
+    return spool
+
+
+def export_frame(df, fmt="csv"):
+    """
+    File handle with df in one of EXPORT_FORMATS.
+    """
+    if fmt == "csv":
+        return export_csv(df)
+    if fmt == "csv.gz":
+        return export_csv(df, compress=True)
+    if fmt == "parquet":
+        return export_parquet(df)
+    raise ValueError(f"Unknown export format {fmt!r}; use one of {sorted(EXPORT_FORMATS)}")
+
+
+def available_formats():
+    return [fmt for fmt in EXPORT_FORMATS if fmt != "parquet" or pq is not None]
+
+
+# --------------------------------------------------
+# SUMMARIES
+# --------------------------------------------------
 
 def export_kpis(kpis):
     clean_kpis = {
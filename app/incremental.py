@@ -0,0 +1,290 @@
+import hashlib
+import io
+import json
+import os
+
+import pandas as pd
+
+from analytics.cleaning import clean_sales_data
+from analytics.topk import merge_topk, topk_from_dict, topk_sketch, topk_to_dict
+from app.engine import (
+    RANKING_KEYS,
+    ROLLUP_KEYS,
+    build_rollups,
+    build_star_rollups,
+    dimensions_are_unique,
+    results_from_rollups,
+)
+from app.ingest_cache import content_hash
+from app.instrument import Profiler
+from app.loader import SALES_DATE_COLUMNS, is_sharded
+from app.schema import CATEGORY_DTYPES, conform_keys
+
+STATE_FILE = os.path.join(".cache", "engine_state.json")
+STATE_VERSION = 3
+
+# Bytes just before the consumed offset, used to detect a rewritten file
+TAIL_PROBE_SIZE = 256
+
+
+# --------------------------------------------------
+# STATE
+# --------------------------------------------------
+
+def empty_state(topk_capacity=None):
+    """
+    With `topk_capacity`, product/customer totals are kept as bounded
+    top-K sketches instead of one entry per key.
+    """
+    state = {
+        "version": STATE_VERSION,
+        "source": None,
+        "topk_capacity": topk_capacity,
+        "total_revenue": 0.0,
+        "order_count": 0,
+        "monthly_sales": {},
+        "daily_sales": {},
+    }
+    for key in ROLLUP_KEYS:
+        state[key] = {}
+    if topk_capacity is not None:
+        for key in RANKING_KEYS:
+            state[key] = {"capacity": topk_capacity, "floor": 0.0, "counts": {}, "errors": {}}
+    return state
+
+
+def load_state(path=STATE_FILE):
+    """
+    Load persisted running totals; any unreadable file means a rebuild.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("version") != STATE_VERSION:
+            return empty_state()
+        return state
+    except Exception:
+        return empty_state()
+
+
+def save_state(state, path=STATE_FILE):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def apply_rollups(state, rollups):
+    """
+    Add a delta rollup bundle into the state.
+    Only the months and keys present in the delta are touched.
+    """
+    state["total_revenue"] += rollups["total_revenue"]
+    state["order_count"] += rollups["order_count"]
+
+    for key in ("monthly_sales", "daily_sales", *ROLLUP_KEYS):
+        if state["topk_capacity"] is not None and key in RANKING_KEYS:
+            sketch = topk_sketch(rollups[key], state["topk_capacity"])
+            state[key] = topk_to_dict(merge_topk(topk_from_dict(state[key]), sketch))
+            continue
+
+        totals = state[key]
+        for label, value in rollups[key].items():
+            label = str(label)
+            totals[label] = totals.get(label, 0.0) + float(value)
+
+    return state
+
+
+def apply_delta(state, sales, customers, products, config):
+    """
+    Clean a batch of new sales rows and fold it into the state.
+    Duplicates are only removed within the batch.
+    """
+    sales = conform_keys(clean_sales_data(sales), customers, products)
+
+    if config["join_strategy"] == "codes" and dimensions_are_unique(customers, products):
+        rollups = build_star_rollups(sales, customers, products)
+    else:
+        df = (
+            sales
+            .merge(customers, on="customer_id")
+            .merge(products, on="product_id")
+        )
+        rollups = build_rollups(df)
+
+    return apply_rollups(state, rollups)
+
+
+def state_to_rollups(state):
+    """
+    Rebuild the rollup bundle run_engine consumes from persisted state.
+    """
+    months = state["monthly_sales"]
+    days = state["daily_sales"]
+
+    rollups = {
+        "total_revenue": state["total_revenue"],
+        "order_count": state["order_count"],
+        "monthly_sales": pd.Series(
+            list(months.values()),
+            index=pd.PeriodIndex(list(months), freq="M"),
+            name="revenue",
+            dtype="float64",
+        ),
+        "daily_sales": pd.Series(
+            list(days.values()),
+            index=pd.DatetimeIndex(list(days), dtype="datetime64[us]", name="order_date"),
+            name="revenue",
+            dtype="float64",
+        ),
+    }
+
+    for key, column in ROLLUP_KEYS.items():
+        totals = state[key]
+        if state["topk_capacity"] is not None and key in RANKING_KEYS:
+            rollups[key] = topk_from_dict(totals, column)
+            continue
+
+        rollups[key] = pd.Series(
+            list(totals.values()),
+            index=pd.Index(list(totals), name=column),
+            name="revenue",
+            dtype="float64",
+        )
+
+    return rollups
+
+
+# --------------------------------------------------
+# APPEND-ONLY SOURCE
+# --------------------------------------------------
+
+class _BoundedReader(io.RawIOBase):
+    """
+    Read-only view of a file between two byte offsets.
+    """
+
+    def __init__(self, f, end):
+        self._f = f
+        self._end = end
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        remaining = self._end - self._f.tell()
+        if remaining <= 0:
+            return 0
+        view = memoryview(buffer)[:remaining]
+        return self._f.readinto(view)
+
+
+def _last_newline_end(f, size):
+    """
+    Offset just past the last complete line, so a half-written
+    trailing row is left for the next refresh.
+    """
+    position = size
+    while position > 0:
+        start = max(0, position - 65536)
+        f.seek(start)
+        block = f.read(position - start)
+        newline = block.rfind(b"\n")
+        if newline >= 0:
+            return start + newline + 1
+        position = start
+    return 0
+
+
+def _tail_probe(f, offset):
+    start = max(0, offset - TAIL_PROBE_SIZE)
+    f.seek(start)
+    return hashlib.blake2b(f.read(offset - start), digest_size=8).hexdigest()
+
+
+def _source_is_extended(source, f, size):
+    """
+    True when the file still starts with everything already consumed.
+    """
+    if source is None or size < source["offset"]:
+        return False
+    return _tail_probe(f, source["offset"]) == source["tail_probe"]
+
+
+def run_engine_incremental(paths, config, state_path=STATE_FILE, profiler=None):
+    """
+    Refresh results by reading only rows appended to sales.csv since
+    the last run.
+
+    Running sums, counts, month buckets and per-key totals are kept in
+    a state file (rankings as top-K sketches when
+    CONFIG['topk_capacity'] is set). A changed customer/product table,
+    a new capacity or a rewritten (not just appended) sales file
+    triggers a full rebuild.
+    """
+    if profiler is None:
+        profiler = Profiler(track_memory=config["profile_memory"])
+
+    if is_sharded(paths["sales"]):
+        raise ValueError("Incremental mode needs a single append-only sales file.")
+
+    customers = pd.read_csv(paths["customers"], dtype=CATEGORY_DTYPES)
+    products = pd.read_csv(paths["products"], dtype=CATEGORY_DTYPES)
+
+    dimensions_hash = content_hash(paths["customers"]) + content_hash(paths["products"])
+
+    state = load_state(state_path)
+
+    with open(paths["sales"], "rb") as f:
+        header = f.readline()
+        header_end = f.tell()
+        size = os.fstat(f.fileno()).st_size
+        end = _last_newline_end(f, size)
+
+        source = state["source"]
+        rebuild = (
+            source is None
+            or state["topk_capacity"] != config["topk_capacity"]
+            or source["header"] != header.decode("utf-8")
+            or source["dimensions_hash"] != dimensions_hash
+            or not _source_is_extended(source, f, size)
+        )
+
+        if rebuild:
+            state = empty_state(config["topk_capacity"])
+            offset = header_end
+        else:
+            offset = source["offset"]
+
+        if end > offset:
+            f.seek(offset)
+            reader = pd.read_csv(
+                io.BufferedReader(_BoundedReader(f, end)),
+                names=pd.read_csv(io.BytesIO(header)).columns,
+                header=None,
+                dtype=CATEGORY_DTYPES,
+                parse_dates=SALES_DATE_COLUMNS,
+                chunksize=config["chunk_size"],
+            )
+            with reader:
+                for chunk in reader:
+                    with profiler.stage("apply_delta", rows_in=len(chunk)):
+                        apply_delta(state, chunk, customers, products, config)
+
+        state["source"] = {
+            "header": header.decode("utf-8"),
+            "dimensions_hash": dimensions_hash,
+            "offset": max(end, offset),
+            "tail_probe": _tail_probe(f, max(end, offset)),
+        }
+
+    save_state(state, state_path)
+
+    if state["order_count"] == 0:
+        raise ValueError("No sales rows matched customers and products.")
+
+    results = results_from_rollups(state_to_rollups(state), config, profiler)
+    results["profile"] = profiler.report()
+    return results
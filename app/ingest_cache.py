@@ -0,0 +1,250 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    feather = None
+
+from app.instrument import Profiler
+from app.loader import ENGINE_COLUMNS, load_csv_data
+from app.schema import CATEGORY_DTYPES, align_keys
+
+CACHE_DIR = os.path.join(".cache", "ingest")
+
+# One metadata file per source path (size, mtime, content hash), so
+# concurrent loads never read-modify-write a shared index
+SOURCES_DIR = "sources"
+
+# Least recently used entries are evicted past this total size
+CACHE_MAX_BYTES = 2 * 2**30
+
+# Bump when the way CSVs are parsed changes so old entries are ignored
+CACHE_VERSION = 2
+
+# Dimension columns are stored as Arrow dictionaries → categoricals on read
+READ_OPTIONS = {
+    "sales": {"dtype": CATEGORY_DTYPES, "parse_dates": ["order_date"]},
+    "customers": {"dtype": CATEGORY_DTYPES},
+    "products": {"dtype": CATEGORY_DTYPES},
+}
+
+HASH_BLOCK_SIZE = 1 << 20
+
+
+# --------------------------------------------------
+# FINGERPRINTS
+# --------------------------------------------------
+
+def _hash_stream(stream):
+    digest = hashlib.blake2b(digest_size=16)
+    for block in iter(lambda: stream.read(HASH_BLOCK_SIZE), b""):
+        digest.update(block)
+    return digest.hexdigest()
+
+
+def _schema_fingerprint(name):
+    """
+    Fingerprint of the parse options used for a table, so a change in
+    how we read CSVs never serves a stale cached schema.
+    """
+    options = json.dumps(
+        {"version": CACHE_VERSION, "options": READ_OPTIONS.get(name, {})},
+        sort_keys=True,
+    )
+    return hashlib.blake2b(options.encode("utf-8"), digest_size=4).hexdigest()
+
+
+def _source_file(cache_dir, path):
+    name = hashlib.blake2b(path.encode("utf-8"), digest_size=16).hexdigest()
+    return os.path.join(cache_dir, SOURCES_DIR, f"{name}.json")
+
+
+def _read_source(cache_dir, path):
+    try:
+        with open(_source_file(cache_dir, path), "r", encoding="utf-8") as f:
+            entry = json.load(f)
+        return entry if isinstance(entry, dict) and entry.get("path") == path else None
+    except Exception:
+        return None
+
+
+def _write_source(cache_dir, path, entry):
+    file_path = _source_file(cache_dir, path)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    tmp_path = f"{file_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"path": path, **entry}, f, indent=4)
+    os.replace(tmp_path, file_path)
+
+
+def content_hash(source, cache_dir=None):
+    """
+    Content hash of a CSV path or file-like object.
+
+    For paths with a `cache_dir`, a stored hash is reused while size and
+    mtime are unchanged, so warm loads never re-read the CSV.
+    """
+    if not isinstance(source, (str, os.PathLike)):
+        position = source.tell()
+        source.seek(0)
+        digest = _hash_stream(source)
+        source.seek(position)
+        return digest
+
+    path = os.path.abspath(source)
+    stat = os.stat(path)
+    entry = _read_source(cache_dir, path) if cache_dir else None
+
+    if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+        return entry["content_hash"]
+
+    with open(path, "rb") as f:
+        digest = _hash_stream(f)
+
+    if cache_dir:
+        _write_source(
+            cache_dir,
+            path,
+            {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "content_hash": digest},
+        )
+
+    return digest
+
+
+# --------------------------------------------------
+# CACHE
+# --------------------------------------------------
+
+def _write_table(df, path):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # Uncompressed Arrow IPC can be memory-mapped without decoding
+    feather.write_feather(table, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, path)
+
+
+def _read_table(path, columns):
+    if columns is not None:
+        with pa.memory_map(path) as source:
+            names = pa.ipc.open_file(source).schema.names
+        columns = [c for c in columns if c in names]
+
+    table = feather.read_table(path, columns=columns, memory_map=True)
+    return table.to_pandas()
+
+
+def evict_cache(cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, keep=()):
+    """
+    Remove the least recently used entries (by mtime, which hits refresh)
+    until the cache fits in `max_bytes`. Entries in `keep` stay.
+    """
+    keep = {os.path.abspath(path) for path in keep}
+    entries = []
+
+    for entry in os.scandir(cache_dir):
+        if not entry.name.endswith(".feather"):
+            continue
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:  # evicted by another process
+            continue
+        entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+
+    total = sum(size for _, size, _ in entries)
+
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if os.path.abspath(path) in keep:
+            continue
+        try:
+            os.remove(path)
+        except OSError:  # already gone, or still open on Windows
+            continue
+        total -= size
+
+
+def load_cached_table(name, source, columns=None, cache_dir=CACHE_DIR, stage=None):
+    """
+    Load one CSV through the columnar cache.
+    Only `columns` are read back (all columns when None).
+    `stage` (a Profiler stage dict) receives cache hit/miss and row count.
+    Returns the frame and the path of its cache entry.
+    """
+    stage = {} if stage is None else stage
+
+    previous = None
+    if isinstance(source, (str, os.PathLike)):
+        previous = (_read_source(cache_dir, os.path.abspath(source)) or {}).get("content_hash")
+
+    digest = content_hash(source, cache_dir)
+    entry_path = os.path.join(cache_dir, f"{name}-{digest}-{_schema_fingerprint(name)}.feather")
+
+    # Source changed on disk → drop the entry it used to point at
+    if previous and previous != digest:
+        stale_path = os.path.join(cache_dir, f"{name}-{previous}-{_schema_fingerprint(name)}.feather")
+        try:
+            os.remove(stale_path)
+        except FileNotFoundError:
+            pass
+
+    try:
+        os.utime(entry_path)  # mark as recently used for evict_cache
+        stage["cache"] = "hit"
+    except FileNotFoundError:  # never cached, or evicted
+        stage["cache"] = "miss"
+        if not isinstance(source, (str, os.PathLike)):
+            source.seek(0)
+        df = pd.read_csv(source, **READ_OPTIONS.get(name, {}))
+        _write_table(df, entry_path)
+
+    df = _read_table(entry_path, columns)
+    stage["rows_out"] = len(df)
+    return df, entry_path
+
+
+def load_cached_data(
+    paths: dict,
+    columns=ENGINE_COLUMNS,
+    cache_dir=CACHE_DIR,
+    profiler=None,
+    max_bytes=CACHE_MAX_BYTES,
+):
+    """
+    Drop-in replacement for load_csv_data backed by a Feather cache.
+
+    Sources are converted once, keyed by content hash (and mtime for
+    paths), then memory-mapped on later loads. The cache is trimmed to
+    `max_bytes`, least recently used first. Falls back to plain CSV
+    parsing when pyarrow is not installed.
+    """
+    profiler = profiler or Profiler()
+
+    if feather is None:
+        with profiler.stage("load_csv"):
+            return load_csv_data(paths)
+
+    os.makedirs(cache_dir, exist_ok=True)
+
+    data = {}
+    used = []
+    for name, source in paths.items():
+        with profiler.stage(f"load:{name}") as stage:
+            data[name], entry_path = load_cached_table(
+                name,
+                source,
+                columns=(columns or {}).get(name),
+                cache_dir=cache_dir,
+                stage=stage,
+            )
+        used.append(entry_path)
+
+    evict_cache(cache_dir, max_bytes, keep=used)
+
+    return align_keys(data)
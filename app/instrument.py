@@ -0,0 +1,120 @@
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# tracemalloc is process-wide, so memory-tracked stages of every Profiler
+# share it: only the outermost one resets the peak and starts/stops tracing
+_tracing = {"depth": 0, "started": False}
+_tracing_lock = threading.Lock()
+
+
+class Profiler:
+    """
+    Per-stage wall time, peak memory delta, row counts and cache hits.
+
+    Stages that run several times (e.g. once per chunk) are accumulated
+    under one name. Stages may nest or run on several threads at once;
+    an inner or concurrent stage's peak then counts from the outermost
+    stage's start, so memory figures overlap. Memory tracking uses
+    tracemalloc, which slows the pipeline down noticeably, so it is
+    opt-in.
+    """
+
+    def __init__(self, track_memory=False):
+        self.track_memory = track_memory
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        """
+        Time a block. The yielded dict accepts `rows_out` and
+        `cache` ("hit" / "miss") from the caller.
+        """
+        info = {}
+
+        if self.track_memory:
+            memory_before = _enter_tracing()
+
+        started = time.perf_counter()
+        try:
+            yield info
+        finally:
+            seconds = time.perf_counter() - started
+
+            peak_mb = None
+            if self.track_memory:
+                peak_mb = (_exit_tracing() - memory_before) / 2**20
+
+            self._record(name, seconds, peak_mb, rows_in, info)
+
+    def _record(self, name, seconds, peak_mb, rows_in, info):
+        with self._lock:
+            self._update(name, seconds, peak_mb, rows_in, info)
+
+    def _update(self, name, seconds, peak_mb, rows_in, info):
+        record = self._stages.setdefault(
+            name,
+            {
+                "stage": name,
+                "calls": 0,
+                "seconds": 0.0,
+                "peak_mb": None,
+                "rows_in": None,
+                "rows_out": None,
+                "cache_hits": 0,
+                "cache_misses": 0,
+            },
+        )
+
+        record["calls"] += 1
+        record["seconds"] += seconds
+
+        if peak_mb is not None:
+            record["peak_mb"] = max(record["peak_mb"] or 0.0, peak_mb)
+        if rows_in is not None:
+            record["rows_in"] = (record["rows_in"] or 0) + rows_in
+        if info.get("rows_out") is not None:
+            record["rows_out"] = (record["rows_out"] or 0) + info["rows_out"]
+
+        if info.get("cache") == "hit":
+            record["cache_hits"] += 1
+        elif info.get("cache") == "miss":
+            record["cache_misses"] += 1
+
+    def report(self):
+        """
+        Stage records in execution order (JSON-serializable).
+        """
+        with self._lock:
+            return [dict(record) for record in self._stages.values()]
+
+
+def _enter_tracing():
+    """
+    Traced memory now; starts tracing and resets the peak only when no
+    other stage is being tracked.
+    """
+    with _tracing_lock:
+        if _tracing["depth"] == 0:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _tracing["started"] = True
+            tracemalloc.reset_peak()
+        _tracing["depth"] += 1
+        return tracemalloc.get_traced_memory()[0]
+
+
+def _exit_tracing():
+    """
+    Peak traced memory; stops tracing after the last stage, if a stage
+    started it.
+    """
+    with _tracing_lock:
+        peak = tracemalloc.get_traced_memory()[1]
+        _tracing["depth"] -= 1
+        if _tracing["depth"] == 0 and _tracing["started"]:
+            tracemalloc.stop()
+            _tracing["started"] = False
+        return peak
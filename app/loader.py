@@ -1,7 +1,188 @@
+import glob
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 
-def load_csv_data(paths: dict):
-    return {
-        name: pd.read_csv(path)
-        for name, path in paths.items()
-    }
+from app.schema import CATEGORY_DTYPES, align_keys, concat_frames
+
+# Compact dtypes for the sales fact table (streaming mode).
+# quantity is nullable so blank cells survive until cleaning fills them.
+SALES_DTYPES = {
+    "customer_id": "category",
+    "product_id": "category",
+    "quantity": "Int32",
+    "price": "float32",
+}
+SALES_DATE_COLUMNS = ["order_date"]
+
+# Columns run_engine actually reads from each table
+ENGINE_COLUMNS = {
+    "sales": ["order_id", "order_date", "customer_id", "product_id", "quantity", "price"],
+    "customers": ["customer_id", "name", "region"],
+    "products": ["product_id", "product_name", "category"],
+}
+
+# Hive-style partition keys in directory names, e.g. sales/year=2024/month=05/
+PARTITION_PATTERN = re.compile(r"^(year|month|day)=(\d+)$")
+
+
+def load_csv_data(paths: dict, date_range=None, max_workers=None):
+    """
+    Load the input CSVs, keeping only sales inside `date_range`.
+
+    `sales` may also be a directory or glob of CSV shards; see
+    load_sales_shards for partition pruning and parallel parsing.
+    Dimension columns are read as categoricals (see app.schema).
+    """
+    data = {}
+
+    for name, path in paths.items():
+        if name == "sales" and is_sharded(path):
+            data[name] = load_sales_shards(path, date_range, max_workers)
+        elif name == "sales":
+            data[name] = filter_date_range(pd.read_csv(path, dtype=CATEGORY_DTYPES), date_range)
+        else:
+            data[name] = pd.read_csv(path, dtype=CATEGORY_DTYPES)
+
+    return align_keys(data)
+
+
+def iter_sales_chunks(path, chunksize=500_000, date_range=None):
+    """
+    Stream the sales CSV(s) in bounded, typed chunks.
+    Memory use is bounded by `chunksize`, not by file size.
+    """
+    files = resolve_sales_files(path, date_range) if is_sharded(path) else [path]
+
+    for file in files:
+        reader = pd.read_csv(
+            file,
+            dtype=SALES_DTYPES,
+            parse_dates=SALES_DATE_COLUMNS,
+            chunksize=chunksize,
+        )
+
+        with reader:
+            for chunk in reader:
+                yield filter_date_range(chunk, date_range)
+
+
+# --------------------------------------------------
+# SHARDED / PARTITIONED SALES
+# --------------------------------------------------
+
+def is_sharded(path):
+    return not os.path.isfile(path)
+
+
+def _partition_bounds(parts):
+    """
+    (first day, last day) covered by year=/month=/day= path parts,
+    or None when the path carries no year partition.
+    """
+    keys = {}
+    for part in parts:
+        match = PARTITION_PATTERN.match(part)
+        if match:
+            keys[match.group(1)] = int(match.group(2))
+
+    if "year" not in keys:
+        return None
+
+    start = pd.Timestamp(year=keys["year"], month=keys.get("month", 1), day=keys.get("day", 1))
+
+    if "day" in keys:
+        end = start
+    elif "month" in keys:
+        end = start + pd.offsets.MonthEnd(0)
+    else:
+        end = start + pd.offsets.YearEnd(0)
+
+    return start, end
+
+
+def _outside(parts, date_range):
+    if date_range is None:
+        return False
+
+    bounds = _partition_bounds(parts)
+    if bounds is None:
+        return False
+
+    start, end = (pd.Timestamp(d) if d is not None else None for d in date_range)
+    return (start is not None and bounds[1] < start) or (end is not None and bounds[0] > end)
+
+
+def resolve_sales_files(source, date_range=None):
+    """
+    CSV shards under a directory or matching a glob, in sorted order.
+
+    Partitions whose year=/month=/day= directory names fall outside
+    `date_range` (start, end) are pruned from the path alone, so their
+    files are never opened (or, for directories, even listed).
+    """
+    if os.path.isdir(source):
+        files = []
+        for root, dirs, names in os.walk(source):
+            relative = os.path.relpath(root, source).split(os.sep)
+            dirs[:] = sorted(
+                d for d in dirs if not _outside(relative + [d], date_range)
+            )
+            files.extend(
+                os.path.join(root, name) for name in names if name.endswith(".csv")
+            )
+    elif any(char in source for char in "*?["):
+        files = glob.glob(source, recursive=True)
+    else:
+        # Neither a file (see is_sharded), a directory nor a pattern
+        raise FileNotFoundError(f"Sales file not found: {source!r}")
+
+    return sorted(
+        f for f in files
+        if not _outside(os.path.normpath(f).split(os.sep), date_range)
+    )
+
+
+def _read_shard(path):
+    return pd.read_csv(path, dtype=CATEGORY_DTYPES, parse_dates=SALES_DATE_COLUMNS)
+
+
+def load_sales_shards(source, date_range=None, max_workers=None):
+    """
+    Parse sales shards in parallel worker processes and concatenate.
+    Rows outside `date_range` are dropped after parsing.
+    """
+    files = resolve_sales_files(source, date_range)
+    if not files:
+        raise FileNotFoundError(f"No sales CSV files found for {source!r}")
+
+    if len(files) == 1 or max_workers == 1:
+        frames = [_read_shard(f) for f in files]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            frames = list(pool.map(_read_shard, files))
+
+    sales = concat_frames(frames)
+    return filter_date_range(sales, date_range)
+
+
+def filter_date_range(sales, date_range):
+    """
+    Keep rows whose order_date falls in the inclusive (start, end) range.
+    Either bound may be None.
+    """
+    if date_range is None:
+        return sales
+
+    start, end = date_range
+    dates = pd.to_datetime(sales["order_date"], errors="coerce")
+    keep = pd.Series(True, index=sales.index)
+
+    if start is not None:
+        keep &= dates >= pd.Timestamp(start)
+    if end is not None:
+        keep &= dates < pd.Timestamp(end) + pd.Timedelta(days=1)
+
+    return sales[keep]
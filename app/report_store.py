@@ -1,54 +1,382 @@
+import hashlib
+import io
 import json
 import os
+import sqlite3
+import threading
+from collections.abc import Mapping
+from contextlib import contextmanager
 from datetime import datetime
 
+import pandas as pd
+
 REPORTS_DIR = "reports"
+REPORTS_DB = os.path.join(REPORTS_DIR, "reports.db")
+
+# Legacy whole-file store, imported once into the database
 REPORTS_FILE = os.path.join(REPORTS_DIR, "reports.json")
 
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    saved_at TEXT NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reports_name ON reports (name);
+CREATE INDEX IF NOT EXISTS reports_saved_at ON reports (saved_at);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    data BLOB NOT NULL
+);
+"""
 
-def load_reports():
+# Stored in PRAGMA user_version once SCHEMA, _migrate and the legacy
+# import have run; bump when any of them changes
+SCHEMA_VERSION = 1
+
+# Database paths this process has already brought up to SCHEMA_VERSION
+_ready = set()
+_ready_lock = threading.Lock()
+
+# Snapshot parts are stored as zstd-compressed Parquet blobs
+BLOB_COMPRESSION = "zstd"
+
+
+@contextmanager
+def _database(write=False):
+    """
+    Open the report database (WAL mode, so readers never block the
+    single writer and concurrent saves queue instead of clobbering).
+    Writes run in an IMMEDIATE transaction and commit atomically.
+    """
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+
+    conn = sqlite3.connect(REPORTS_DB, timeout=30, isolation_level=None)
+    try:
+        _ensure_schema(conn)
+
+        if not write:
+            yield conn
+            return
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+
+def _ensure_schema(conn):
+    """
+    Create, migrate and import legacy reports once per database: once
+    per process, and across processes only while user_version is behind.
     """
-    Load saved reports safely.
-    This function can NEVER throw JSONDecodeError.
+    path = os.path.abspath(REPORTS_DB)
+
+    with _ready_lock:
+        if path in _ready:
+            return
+
+        if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Re-check under the write lock: another process may have won
+                if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                    # executescript() would commit; run statements one by one
+                    for statement in SCHEMA.split(";"):
+                        if statement.strip():
+                            conn.execute(statement)
+                    _migrate(conn)
+                    _import_legacy_file(conn)
+                    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+        _ready.add(path)
+
+
+def _migrate(conn):
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(reports)")}
+    if "snapshot" not in columns:
+        conn.execute("ALTER TABLE reports ADD COLUMN snapshot TEXT")
+
+
+def _import_legacy_file(conn):
     """
-    # File does not exist → no reports
+    Copy reports from the old reports.json into the database, once.
+    Runs inside _ensure_schema's write transaction.
+    """
+    if conn.execute("SELECT 1 FROM meta WHERE key = 'legacy_imported'").fetchone():
+        return
+
+    for report in _read_legacy_file():
+        _insert(conn, report)
+    conn.execute("INSERT INTO meta (key, value) VALUES ('legacy_imported', '1')")
+
+
+def _read_legacy_file():
     if not os.path.exists(REPORTS_FILE):
         return []
 
     try:
         with open(REPORTS_FILE, "r", encoding="utf-8") as f:
-            raw = f.read()
+            data = json.load(f)
+        return [r for r in data if isinstance(r, dict)] if isinstance(data, list) else []
+    except Exception:
+        return []
 
-        # Empty or whitespace-only file
-        if not raw or raw.strip() == "":
-            return []
 
-        data = json.loads(raw)
+def _insert(conn, report_data, snapshot=None):
+    cursor = conn.execute(
+        "INSERT INTO reports (name, saved_at, payload, snapshot) VALUES (?, ?, ?, ?)",
+        (
+            str(report_data.get("name", "")),
+            str(report_data.get("saved_at", "")),
+            json.dumps(report_data),
+            json.dumps(snapshot) if snapshot is not None else None,
+        ),
+    )
+    return cursor.lastrowid
 
-        # Corrupted but valid JSON type
-        if not isinstance(data, list):
-            return []
 
-        return data
+def _rows_to_reports(rows):
+    """
+    Decode stored payloads; a damaged row is skipped, not the whole history.
+    """
+    reports = []
+    for report_id, payload in rows:
+        try:
+            report = json.loads(payload)
+        except ValueError:
+            continue
+        if isinstance(report, dict):
+            report["id"] = report_id
+            reports.append(report)
+    return reports
+
 
+def load_reports():
+    """
+    Load all saved reports, oldest first.
+    This function can NEVER throw.
+    """
+    try:
+        with _database() as conn:
+            rows = conn.execute("SELECT id, payload FROM reports ORDER BY id").fetchall()
+        return _rows_to_reports(rows)
     except Exception:
         # Any failure → fail safe
         return []
 
 
-def save_report(report_data):
+def list_reports(name=None, since=None, until=None, limit=50, offset=0, errors=None):
     """
-    Save a report safely.
-    This function guarantees persistence without crashes.
+    One page of saved reports, newest first.
+
+    `name` matches as a substring; `since`/`until` are ISO date(time)
+    strings compared against saved_at.
+    Never throws: on failure returns [] and, when `errors` is a list,
+    appends the reason to it.
     """
-    os.makedirs(REPORTS_DIR, exist_ok=True)
+    clauses = []
+    params = []
+
+    if name:
+        clauses.append("name LIKE ?")
+        params.append(f"%{name}%")
+    if since:
+        clauses.append("saved_at >= ?")
+        params.append(str(since))
+    if until:
+        clauses.append("saved_at <= ?")
+        params.append(str(until))
+
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    try:
+        with _database() as conn:
+            rows = conn.execute(
+                f"SELECT id, payload FROM reports {where} ORDER BY id DESC LIMIT ? OFFSET ?",
+                (*params, limit, offset),
+            ).fetchall()
+    except Exception as exc:
+        _record_error(errors, exc)
+        return []
+
+    return _rows_to_reports(rows)
+
 
-    reports = load_reports()
+def get_report(report_id, errors=None):
+    """
+    One saved report, or None if missing or unreadable (never throws;
+    see list_reports for `errors`).
+    """
+    try:
+        with _database() as conn:
+            rows = conn.execute(
+                "SELECT id, payload FROM reports WHERE id = ?", (report_id,)
+            ).fetchall()
+    except Exception as exc:
+        _record_error(errors, exc)
+        return None
+
+    reports = _rows_to_reports(rows)
+    return reports[0] if reports else None
+
+
+def _record_error(errors, exc):
+    if errors is not None:
+        errors.append(f"{type(exc).__name__}: {exc}")
 
+
+def save_report(report_data, snapshot=None):
+    """
+    Save a report safely.
+    One atomic INSERT: cost does not grow with history.
+
+    `snapshot` optionally persists full results (see
+    snapshot_from_results) so the report can be reopened without the
+    source data.
+    """
     report_data = dict(report_data)  # defensive copy
     report_data["saved_at"] = datetime.now().isoformat()
 
-    reports.append(report_data)
+    with _database(write=True) as conn:
+        manifest = _store_snapshot(conn, snapshot) if snapshot is not None else None
+        return _insert(conn, report_data, manifest)
+
+
+# --------------------------------------------------
+# RESULT SNAPSHOTS
+# --------------------------------------------------
+
+def snapshot_from_results(results, decisions=None, forecast=None, model_used=None):
+    """
+    Everything needed to re-render a report: engine output, decisions
+    and forecast.
+    """
+    kpis = results["kpis"]
+
+    snapshot = {
+        "kpis": {
+            "total_revenue": float(kpis["total_revenue"]),
+            "avg_order_value": float(kpis["avg_order_value"]),
+        },
+        "monthly_sales": results["monthly_sales"],
+        "growth": results["growth"],
+        "top_products": kpis["top_products"],
+        "top_customers": kpis["top_customers"],
+        "insights": list(results["insights"]),
+    }
+
+    if decisions is not None:
+        snapshot["decisions"] = decisions
+    if forecast is not None:
+        snapshot["forecast"] = forecast
+        snapshot["model_used"] = model_used
+
+    return snapshot
+
+
+def _encode_frame(frame):
+    buffer = io.BytesIO()
+    frame.to_parquet(buffer, compression=BLOB_COMPRESSION)
+    return buffer.getvalue()
+
+
+def _store_snapshot(conn, snapshot):
+    """
+    Write frames/series as content-addressed blobs (identical parts are
+    stored once) and return the JSON manifest kept on the report row.
+    """
+    manifest = {}
+
+    for part, value in snapshot.items():
+        if isinstance(value, pd.Series):
+            column = str(value.name) if value.name is not None else "value"
+            data = _encode_frame(value.to_frame(name=column))
+            entry = {"kind": "series", "column": column, "name": value.name}
+        elif isinstance(value, pd.DataFrame):
+            data = _encode_frame(value)
+            entry = {"kind": "frame"}
+        else:
+            manifest[part] = {"kind": "json", "value": value}
+            continue
+
+        digest = hashlib.sha256(data).hexdigest()
+        conn.execute("INSERT OR IGNORE INTO blobs (hash, data) VALUES (?, ?)", (digest, data))
+
+        entry["blob"] = digest
+        manifest[part] = entry
+
+    return manifest
+
+
+class Snapshot(Mapping):
+    """
+    Read-only view of a saved snapshot.
+    Blob parts are fetched and decoded on first access only.
+    """
+
+    def __init__(self, manifest):
+        self._manifest = manifest
+        self._loaded = {}
+
+    def __getitem__(self, part):
+        if part not in self._loaded:
+            self._loaded[part] = self._load(self._manifest[part])
+        return self._loaded[part]
+
+    def __iter__(self):
+        return iter(self._manifest)
+
+    def __len__(self):
+        return len(self._manifest)
+
+    @staticmethod
+    def _load(entry):
+        if entry["kind"] == "json":
+            return entry["value"]
+
+        with _database() as conn:
+            row = conn.execute(
+                "SELECT data FROM blobs WHERE hash = ?", (entry["blob"],)
+            ).fetchone()
+
+        frame = pd.read_parquet(io.BytesIO(row[0]))
+
+        if entry["kind"] == "series":
+            return frame[entry["column"]].rename(entry["name"])
+        return frame
+
+
+def load_snapshot(report_id, errors=None):
+    """
+    Lazily-loaded snapshot of a saved report, or None if it has none or
+    it can't be read (never throws; see list_reports for `errors`).
+    """
+    try:
+        with _database() as conn:
+            row = conn.execute(
+                "SELECT snapshot FROM reports WHERE id = ?", (report_id,)
+            ).fetchone()
+
+        if row is None or row[0] is None:
+            return None
 
-    with open(REPORTS_FILE, "w", encoding="utf-8") as f:
-        json.dump(reports, f, indent=4)
+        return Snapshot(json.loads(row[0]))
+    except Exception as exc:
+        _record_error(errors, exc)
+        return None
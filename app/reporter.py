@@ -1,4 +1,5 @@
 import json
+import os
 
 def report_console(results):
     print("\n📊 KPI SUMMARY")
@@ -11,5 +12,10 @@ def report_console(results):
 
 
 def report_json(results, path="storage/reports/report.json"):
-    with open(path, "w") as f:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    # Write then rename, so readers never see a half-written report
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
         json.dump(results, f, default=str, indent=4)
+    os.replace(tmp_path, path)
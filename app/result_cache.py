@@ -0,0 +1,108 @@
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import pandas as pd
+
+
+def estimate_size(value):
+    """
+    Approximate in-memory size of a cached value in bytes.
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k) + estimate_size(v) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache with an entry limit and a memory budget.
+
+    Concurrent callers asking for the same key share one computation
+    (single flight), so several sessions on one server never pay for
+    the same work twice. Cached values must be treated as read-only.
+    """
+
+    def __init__(self, max_bytes, max_entries=None):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._inflight = {}  # key -> Future
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            value = compute()
+        except BaseException as exc:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(exc)
+            raise
+
+        with self._lock:
+            del self._inflight[key]
+            self._store(key, value)
+
+        future.set_result(value)
+        return value
+
+    def _store(self, key, value):
+        size = estimate_size(value)
+
+        # Larger than the whole budget → never cache it
+        if size > self.max_bytes:
+            return
+
+        self._entries[key] = (value, size)
+        self._bytes += size
+
+        while self._entries and (
+            self._bytes > self.max_bytes
+            or (self.max_entries and len(self._entries) > self.max_entries)
+        ):
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+
+# Dimension columns (join keys and labels) kept as pandas categoricals
+# from load to rollup: one small integer code per row instead of a
+# string object, and groupbys/joins over codes instead of hashes.
+CATEGORICAL_COLUMNS = (
+    "customer_id",
+    "product_id",
+    "name",
+    "customer_name",
+    "region",
+    "country",
+    "city",
+    "product_name",
+    "category",
+)
+
+# read_csv dtype= for any table; absent columns are ignored
+CATEGORY_DTYPES = {column: "category" for column in CATEGORICAL_COLUMNS}
+
+# Join key shared by the sales table and each dimension table
+KEY_COLUMNS = {"customers": "customer_id", "products": "product_id"}
+
+
+def to_categorical(df, columns=CATEGORICAL_COLUMNS):
+    """
+    Convert the dimension columns present in `df` to categoricals.
+    """
+    for column in columns:
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype("category")
+    return df
+
+
+def union_categories(columns):
+    """
+    Categories of every column, the first column's in their own order.
+    """
+    categories = columns[0].cat.categories
+    for column in columns[1:]:
+        categories = categories.append(column.cat.categories.difference(categories))
+    return categories
+
+
+def concat_frames(frames):
+    """
+    pd.concat that keeps categoricals: columns are recoded onto shared
+    categories first (concat falls back to object when they differ).
+    """
+    frames = [to_categorical(frame) for frame in frames]
+
+    for column in frames[0].columns:
+        if not isinstance(frames[0][column].dtype, pd.CategoricalDtype):
+            continue
+        categories = union_categories([frame[column] for frame in frames])
+        for frame in frames:
+            frame[column] = frame[column].cat.set_categories(categories)
+
+    return pd.concat(frames, ignore_index=True)
+
+
+# --------------------------------------------------
+# JOIN KEYS
+# --------------------------------------------------
+
+def align_keys(data):
+    """
+    Give each join key identical categories in sales and its dimension
+    table (dimension keys first, then keys only sales has), so merges
+    keep the categorical dtype and the star join maps codes directly.
+    """
+    if "sales" not in data:
+        return data
+    to_categorical(data["sales"])
+
+    for name, key in KEY_COLUMNS.items():
+        if name not in data:
+            continue
+        dimension = to_categorical(data[name])
+        categories = union_categories([dimension[key], data["sales"][key]])
+        dimension[key] = dimension[key].cat.set_categories(categories)
+        data["sales"][key] = data["sales"][key].cat.set_categories(categories)
+
+    return data
+
+
+def conform_keys(sales, customers, products):
+    """
+    Recode a batch of sales onto the dimension tables' key categories.
+    Keys missing from a dimension become NaN; the join drops them anyway.
+    """
+    sales = to_categorical(sales.copy(deep=False))
+
+    for dimension, key in ((customers, "customer_id"), (products, "product_id")):
+        sales[key] = sales[key].cat.set_categories(dimension[key].cat.categories)
+
+    return sales
+
+
+def shared_key_rows(keys, dimension_keys):
+    """
+    Row position of each key in `dimension_keys` (-1 if absent), for
+    categoricals with identical categories: a code lookup, no hashing.
+    Returns None when the categories differ.
+    """
+    if not (
+        isinstance(keys.dtype, pd.CategoricalDtype)
+        and isinstance(dimension_keys.dtype, pd.CategoricalDtype)
+        and keys.cat.categories.equals(dimension_keys.cat.categories)
+    ):
+        return None
+
+    codes = dimension_keys.cat.codes.to_numpy()
+    valid = codes >= 0
+
+    # One extra slot so code -1 (missing key) maps to -1
+    rows = np.full(len(dimension_keys.cat.categories) + 1, -1, dtype="int32")
+    rows[codes[valid]] = np.flatnonzero(valid)
+    return rows[keys.cat.codes.to_numpy()]
@@ -0,0 +1,198 @@
+"""
+Time and memory-profile the engine pipeline on synthetic data.
+
+    python -m benchmarks.run --rows 1e6 --output bench.json
+    python -m benchmarks.run --rows 1e6 --baseline bench.json
+"""
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from analytics.cleaning import clean_sales_data
+from analytics.decisions import executive_decision_engine
+from analytics.forecasting import smart_forecast
+from analytics.kpis import calculate_kpis
+from analytics.dates import bucket_sum, date_codes, freq_unit
+from analytics.time_analysis import analyze_series, time_hierarchy
+from app.config import CONFIG
+from app.duckdb_backend import duckdb, run_engine_duckdb
+from app.engine import run_engine
+from app.loader import load_csv_data
+from benchmarks.synthetic import write_dataset
+
+
+def measure(func, *args, repeat=1):
+    """
+    Best wall time over `repeat` untraced runs, plus the peak traced
+    memory of one extra run (tracemalloc slows code down, so it is
+    kept out of the timings).
+    """
+    seconds = []
+    result = None
+
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(*args)
+        seconds.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return result, {"seconds": min(seconds), "peak_mb": peak / 2**20}
+
+
+def _merge(sales, data):
+    return (
+        sales
+        .merge(data["customers"], on="customer_id")
+        .merge(data["products"], on="product_id")
+    )
+
+
+def _time_analysis(df, freq):
+    # Same path as the engine: daily totals → every grain → `freq`'s series
+    daily_sales = bucket_sum(date_codes(df, "day"), df["revenue"], "day")
+    return analyze_series(time_hierarchy(daily_sales)[freq_unit(freq)])
+
+
+def run_pipeline(paths, repeat=1):
+    stages = {}
+
+    data, stages["load_csv_data"] = measure(load_csv_data, paths, repeat=repeat)
+    sales, stages["clean_sales_data"] = measure(
+        lambda: clean_sales_data(data["sales"].copy()), repeat=repeat
+    )
+    df, stages["merge"] = measure(_merge, sales, data, repeat=repeat)
+    _, stages["calculate_kpis"] = measure(calculate_kpis, df, repeat=repeat)
+    (monthly, growth, _, _), stages["time_analysis"] = measure(
+        _time_analysis, df, CONFIG["date_freq"], repeat=repeat
+    )
+    _, stages["executive_decision_engine"] = measure(
+        executive_decision_engine, df, monthly, growth, repeat=repeat
+    )
+    _, stages["smart_forecast"] = measure(smart_forecast, monthly, repeat=repeat)
+    _, stages["run_engine"] = measure(
+        lambda: run_engine({**data, "sales": data["sales"].copy()}, CONFIG), repeat=repeat
+    )
+
+    if duckdb is not None:
+        _, stages["run_engine_duckdb"] = measure(run_engine_duckdb, paths, CONFIG, repeat=repeat)
+
+    return stages
+
+
+def compare(current, baseline, tolerance):
+    """
+    Stages whose time or memory grew by more than `tolerance` (a ratio).
+    """
+    regressions = []
+
+    for stage, now in current["stages"].items():
+        before = baseline.get("stages", {}).get(stage)
+        if before is None:
+            continue
+
+        for metric in ("seconds", "peak_mb"):
+            if before[metric] > 0 and now[metric] > before[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{stage}.{metric}: {before[metric]:.4f} → {now[metric]:.4f} "
+                    f"({now[metric] / before[metric]:.2f}x)"
+                )
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the sales engine pipeline.")
+    parser.add_argument("--rows", type=float, default=1e5, help="sales rows (1e4 … 1e8)")
+    parser.add_argument("--customers", type=int, default=10_000)
+    parser.add_argument("--products", type=int, default=1_000)
+    parser.add_argument("--regions", type=int, default=4)
+    parser.add_argument("--categories", type=int, default=5)
+    parser.add_argument("--start", default="2022-01-01")
+    parser.add_argument("--days", type=int, default=730, help="date span in days")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument(
+        "--data-dir",
+        help="write CSVs here instead of a temp dir; reused if already written with the same parameters",
+    )
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown ratio")
+    args = parser.parse_args(argv)
+
+    params = {
+        "rows": int(args.rows),
+        "customers": args.customers,
+        "products": args.products,
+        "regions": args.regions,
+        "categories": args.categories,
+        "start": args.start,
+        "days": args.days,
+        "seed": args.seed,
+        "repeat": args.repeat,
+    }
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = write_dataset(
+            args.data_dir or tmp_dir,
+            params["rows"],
+            n_customers=args.customers,
+            n_products=args.products,
+            n_regions=args.regions,
+            n_categories=args.categories,
+            start=args.start,
+            days=args.days,
+            seed=args.seed,
+            reuse=True,
+        )
+        stages = run_pipeline(paths, repeat=args.repeat)
+
+    results = {
+        "meta": {
+            "created_at": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+        },
+        "params": params,
+        "stages": stages,
+    }
+
+    for stage, metrics in stages.items():
+        print(f"{stage:<28} {metrics['seconds']:>10.4f} s {metrics['peak_mb']:>10.1f} MB")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+        if baseline.get("params") != params:
+            print("⚠ Baseline was recorded with different parameters.")
+
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"🚨 {line}")
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from app.schema import align_keys
+
+DEFAULT_REGIONS = ["North", "South", "East", "West"]
+DEFAULT_CATEGORIES = ["Electronics", "Furniture", "Clothing", "Grocery", "Toys"]
+
+# Rows generated per block when writing large datasets to disk
+WRITE_BLOCK_ROWS = 1_000_000
+
+# Generation parameters of a written dataset; written last, so only a
+# complete dataset has one
+DATASET_FILE = "dataset.json"
+
+
+def generate_dimensions(n_customers=1_000, n_products=200, n_regions=4, n_categories=5, seed=0):
+    """
+    Customers and products tables with the same columns as data/*.csv.
+    """
+    rng = np.random.default_rng(seed)
+
+    regions = (DEFAULT_REGIONS + [f"Region {i}" for i in range(n_regions)])[:n_regions]
+    categories = (DEFAULT_CATEGORIES + [f"Category {i}" for i in range(n_categories)])[:n_categories]
+
+    customers = pd.DataFrame(
+        {
+            "customer_id": [f"C{i:07d}" for i in range(n_customers)],
+            "name": [f"Customer {i}" for i in range(n_customers)],
+            "region": rng.choice(regions, n_customers),
+            "signup_date": (
+                pd.Timestamp("2020-01-01")
+                + pd.to_timedelta(rng.integers(0, 1_000, n_customers), unit="D")
+            ).strftime("%Y-%m-%d"),
+        }
+    )
+
+    products = pd.DataFrame(
+        {
+            "product_id": [f"P{i:06d}" for i in range(n_products)],
+            "product_name": [f"Product {i}" for i in range(n_products)],
+            "category": rng.choice(categories, n_products),
+        }
+    )
+
+    return customers, products
+
+
+def generate_sales(n_rows, n_customers=1_000, n_products=200, start="2022-01-01",
+                   days=730, seed=0, first_order_id=1):
+    """
+    Sales fact rows referencing the generated dimension ids.
+    """
+    rng = np.random.default_rng(seed)
+
+    return pd.DataFrame(
+        {
+            "order_id": np.arange(first_order_id, first_order_id + n_rows),
+            "order_date": (
+                pd.Timestamp(start) + pd.to_timedelta(rng.integers(0, days, n_rows), unit="D")
+            ).strftime("%Y-%m-%d"),
+            "customer_id": np.char.add("C", np.char.zfill(rng.integers(0, n_customers, n_rows).astype(str), 7)),
+            "product_id": np.char.add("P", np.char.zfill(rng.integers(0, n_products, n_rows).astype(str), 6)),
+            "quantity": rng.integers(1, 10, n_rows),
+            "price": rng.integers(10, 2_000, n_rows),
+        }
+    )
+
+
+def generate_dataset(n_rows, n_customers=1_000, n_products=200, n_regions=4,
+                     n_categories=5, start="2022-01-01", days=730, seed=0):
+    """
+    In-memory dataset dict, shaped like load_csv_data's output.
+    """
+    customers, products = generate_dimensions(
+        n_customers, n_products, n_regions, n_categories, seed=seed
+    )
+    sales = generate_sales(n_rows, n_customers, n_products, start, days, seed=seed + 1)
+    return align_keys({"sales": sales, "customers": customers, "products": products})
+
+
+def _read_params(directory):
+    try:
+        with open(os.path.join(directory, DATASET_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_dataset(directory, n_rows, n_customers=1_000, n_products=200, n_regions=4,
+                  n_categories=5, start="2022-01-01", days=730, seed=0, reuse=False):
+    """
+    Write sales/customers/products CSVs to `directory`.
+
+    Sales are generated and appended in blocks, so datasets far larger
+    than memory (1e8 rows) can be produced. With `reuse`, a dataset
+    already written there with the same parameters is kept as is.
+    Returns the paths dict.
+    """
+    os.makedirs(directory, exist_ok=True)
+
+    paths = {
+        name: os.path.join(directory, f"{name}.csv")
+        for name in ("sales", "customers", "products")
+    }
+    params = {
+        "rows": int(n_rows),
+        "customers": n_customers,
+        "products": n_products,
+        "regions": n_regions,
+        "categories": n_categories,
+        "start": start,
+        "days": days,
+        "seed": seed,
+    }
+
+    if reuse and _read_params(directory) == params and all(map(os.path.isfile, paths.values())):
+        return paths
+
+    # Stale parameters must not outlive a partial rewrite
+    if os.path.exists(os.path.join(directory, DATASET_FILE)):
+        os.remove(os.path.join(directory, DATASET_FILE))
+
+    customers, products = generate_dimensions(
+        n_customers, n_products, n_regions, n_categories, seed=seed
+    )
+    customers.to_csv(paths["customers"], index=False)
+    products.to_csv(paths["products"], index=False)
+
+    written = 0
+    block = 0
+    with open(paths["sales"], "w", encoding="utf-8", newline="") as f:
+        while written < n_rows or block == 0:
+            rows = min(WRITE_BLOCK_ROWS, n_rows - written)
+            sales = generate_sales(
+                rows, n_customers, n_products, start, days,
+                seed=seed + 1 + block, first_order_id=1 + written,
+            )
+            sales.to_csv(f, index=False, header=block == 0)
+            written += rows
+            block += 1
+
+    with open(os.path.join(directory, DATASET_FILE), "w", encoding="utf-8") as f:
+        json.dump(params, f, indent=4)
+
+    return paths
@@ -1,17 +1,79 @@
+import argparse
+import json
+import os
+import sys
+
+from app.batch import format_summary, load_manifest, run_batch, run_dataset
 from app.config import CONFIG
-from app.loader import load_csv_data
-from app.engine import run_engine
+from app.instrument import Profiler
 from app.reporter import report_console, report_json
 
-data = load_csv_data({
+PATHS = {
     "sales": "data/sales.csv",
     "customers": "data/customers.csv",
     "products": "data/products.csv"
-})
+}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the sales analytics engine.")
+    parser.add_argument("--sales", default=PATHS["sales"], help="CSV file, directory of shards or glob")
+    parser.add_argument("--customers", default=PATHS["customers"])
+    parser.add_argument("--products", default=PATHS["products"])
+    parser.add_argument("--start", help="first order date to include (YYYY-MM-DD)")
+    parser.add_argument("--end", help="last order date to include (YYYY-MM-DD)")
+
+    batch = parser.add_argument_group("batch mode")
+    batch.add_argument("--manifest", help="JSON/CSV list of tenant datasets; runs headless")
+    batch.add_argument("--output", default=CONFIG["batch_output_dir"], help="per-tenant output directory")
+    batch.add_argument("--workers", type=int, default=CONFIG["batch_workers"], help="worker processes")
+    batch.add_argument(
+        "--worker-memory-mb",
+        type=int,
+        default=CONFIG["batch_worker_memory_mb"],
+        help="address-space cap per worker (0 = none)",
+    )
+    return parser.parse_args(argv)
+
+
+def run_single(args):
+    paths = {"sales": args.sales, "customers": args.customers, "products": args.products}
+    if args.start or args.end:
+        CONFIG["date_range"] = (args.start, args.end)
+
+    profiler = Profiler(track_memory=CONFIG["profile_memory"])
+    results = run_dataset(paths, CONFIG, profiler)
+
+    if CONFIG["report_format"] == "console":
+        report_console(results)
+    elif CONFIG["report_format"] == "json":
+        report_json(results)
+
+    # Per-stage timings, rows and cache hits
+    if CONFIG["profile_path"]:
+        os.makedirs(os.path.dirname(CONFIG["profile_path"]) or ".", exist_ok=True)
+        with open(CONFIG["profile_path"], "w", encoding="utf-8") as f:
+            json.dump(results["profile"], f, indent=4)
+
+    return 0
+
+
+def run_manifest(args):
+    summary = run_batch(
+        load_manifest(args.manifest),
+        CONFIG,
+        args.output,
+        max_workers=args.workers,
+        worker_memory_mb=args.worker_memory_mb,
+    )
+    print(format_summary(summary))
+    return 1 if summary["failed"] else 0
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    return run_manifest(args) if args.manifest else run_single(args)
 
-results = run_engine(data, CONFIG)
 
-if CONFIG["report_format"] == "console":
-    report_console(results)
-elif CONFIG["report_format"] == "json":
-    report_json(results)
+if __name__ == "__main__":
+    sys.exit(main())
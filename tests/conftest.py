@@ -0,0 +1,33 @@
+import pytest
+
+# Dirty sales: a bad date, a repeated order_id with different content
+# (the first row must win), a blank quantity and a negative price
+SALES = """order_id,order_date,customer_id,product_id,quantity,price
+1001,2023-01-15,C001,P001,2,500
+1002,2023-02-10,C002,P002,1,1200
+1003,not a date,C001,P002,1,1200
+1004,2023-03-01,C002,P001,3,500
+1002,2023-02-10,C001,P001,1,1
+1005,2023-03-20,C001,P002,,1200
+1006,2023-03-21,C002,P001,1,-10
+"""
+
+CUSTOMERS = """customer_id,name,region
+C001,Amit,North
+C002,Sara,South
+"""
+
+PRODUCTS = """product_id,product_name,category
+P001,Laptop,Electronics
+P002,Phone,Electronics
+"""
+
+
+@pytest.fixture
+def paths(tmp_path):
+    paths = {}
+    for name, text in (("sales", SALES), ("customers", CUSTOMERS), ("products", PRODUCTS)):
+        paths[name] = str(tmp_path / f"{name}.csv")
+        with open(paths[name], "w", encoding="utf-8") as f:
+            f.write(text)
+    return paths
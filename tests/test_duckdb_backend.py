@@ -0,0 +1,23 @@
+import pytest
+
+pytest.importorskip("duckdb")
+
+from app.config import CONFIG
+from app.duckdb_backend import run_engine_duckdb
+from app.engine import run_engine
+from app.loader import load_csv_data
+
+
+def test_duckdb_matches_pandas_on_dirty_sales(paths, tmp_path, monkeypatch):
+    # A bad date becomes NaT/NULL instead of failing the run, and the
+    # conflicting duplicate of order 1002 is dropped (first row wins)
+    monkeypatch.chdir(tmp_path)
+    expected = run_engine(load_csv_data(paths), CONFIG)
+    result = run_engine_duckdb(paths, CONFIG)
+
+    assert result["kpis"]["total_revenue"] == pytest.approx(expected["kpis"]["total_revenue"])
+    assert result["kpis"]["top_products"].to_dict() == pytest.approx(
+        expected["kpis"]["top_products"].to_dict()
+    )
+    assert result["cleaning"] == expected["cleaning"]
+    assert {e["rule"]: e["rows_touched"] for e in result["cleaning"]}["parse_date"] == 5
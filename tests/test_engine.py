@@ -0,0 +1,18 @@
+import pytest
+
+from app.config import CONFIG
+from app.engine import run_engine, run_engine_streaming
+from app.loader import load_csv_data
+
+
+@pytest.mark.parametrize("chunk_size", [2, 3, 1000])
+def test_streaming_matches_memory_for_any_chunk_size(paths, chunk_size):
+    # Order 1002 repeats across chunk boundaries for small chunk sizes
+    expected = run_engine(load_csv_data(paths), CONFIG)
+    result = run_engine_streaming(paths, dict(CONFIG, chunk_size=chunk_size))
+
+    assert result["kpis"]["total_revenue"] == pytest.approx(expected["kpis"]["total_revenue"])
+    assert result["kpis"]["top_products"].to_dict() == pytest.approx(
+        expected["kpis"]["top_products"].to_dict()
+    )
+    assert result["cleaning"] == expected["cleaning"]
@@ -1,6 +1,8 @@
 import sys
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import pandas as pd
 import streamlit as st
 
@@ -9,12 +11,26 @@ import streamlit as st
 # --------------------------------------------------
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from app.engine import run_engine
+from app.engine import results_at_grain, results_from_rollups, run_engine
+from app.exporter import EXPORT_FORMATS, available_formats, export_frame
 from app.config import CONFIG
+from app.ingest_cache import content_hash, load_cached_data
+from app.instrument import Profiler
+from app.result_cache import ResultCache
+from app.schema import to_categorical
+from analytics.cube import build_cube, cube_rollups, slice_cube
+from analytics.dates import CODE_COLUMNS, add_date_codes, freq_unit
+from analytics.sketches import approximate_kpis, build_sketches
 from analytics.decisions import executive_decision_engine
 from analytics.forecasting import smart_forecast
 from analytics.alerts import generate_alerts
-from app.report_store import save_report, load_reports
+from app.report_store import (
+    get_report,
+    list_reports,
+    load_snapshot,
+    save_report,
+    snapshot_from_results,
+)
 
 # --------------------------------------------------
 # Page Config
@@ -27,6 +43,95 @@ st.set_page_config(
 st.title("📊 Sales Intelligence Platform")
 st.caption("Enterprise-grade, schema-adaptive sales analytics")
 
+# --------------------------------------------------
+# Saved Reports (reopened from snapshots, no source data needed)
+# --------------------------------------------------
+def render_saved_report(report_id):
+    errors = []
+    report = get_report(report_id, errors=errors)
+
+    if report is None:
+        st.error(f"❌ Could not open this report. {' '.join(errors)}")
+        return
+
+    snapshot = load_snapshot(report_id, errors=errors)
+    for error in errors:
+        st.error(f"❌ Could not load the report snapshot: {error}")
+
+    st.subheader(f"📂 {report['name']}")
+    filters = report.get("filters", {})
+    st.caption(
+        f"Saved {report['saved_at'][:16]} · Region: {filters.get('region', 'All')}, "
+        f"Category: {filters.get('category', 'All')}, "
+        f"Dates: {' → '.join(filters.get('date_range', []))}, "
+        f"Grain: {filters.get('grain', 'Month')}"
+    )
+
+    if snapshot is None:
+        st.info("ℹ️ This report was saved before full snapshots; showing summary only.")
+        kpis = report.get("kpis", {})
+        c1, c2 = st.columns(2)
+        c1.metric("Total Revenue", f"{kpis.get('total_revenue', 0)}")
+        c2.metric("Avg Order Value", f"{kpis.get('avg_order_value', 0):.2f}")
+        for insight in report.get("insights", []):
+            st.success(insight)
+        return
+
+    c1, c2 = st.columns(2)
+    c1.metric("Total Revenue", f"{snapshot['kpis']['total_revenue']}")
+    c2.metric("Avg Order Value", f"{snapshot['kpis']['avg_order_value']:.2f}")
+
+    if "forecast" in snapshot:
+        st.caption(f"Forecasting model used: **{snapshot['model_used']}**")
+        st.line_chart(
+            pd.concat(
+                [
+                    snapshot["monthly_sales"].rename("Actual"),
+                    snapshot["forecast"]["forecast"].rename("Forecast"),
+                ],
+                axis=1,
+            )
+        )
+    else:
+        st.line_chart(snapshot["monthly_sales"].rename("Actual"))
+
+    for insight in snapshot["insights"]:
+        st.success(insight)
+
+    if "decisions" in snapshot:
+        decisions = snapshot["decisions"]
+        st.markdown(f"**Business Health:** {decisions['health_score']}/100")
+        for r in decisions["risks"]:
+            st.warning(r)
+        for rec in decisions["recommendations"]:
+            st.info(rec)
+
+    with st.expander("🏆 Top Products & Customers"):
+        c1, c2 = st.columns(2)
+        c1.dataframe(snapshot["top_products"])
+        c2.dataframe(snapshot["top_customers"])
+
+
+st.sidebar.header("📂 Saved Reports")
+
+saved_reports = {"—": None}
+store_errors = []
+for saved in list_reports(limit=50, errors=store_errors):
+    saved_reports[f"#{saved['id']} {saved['name']} ({saved['saved_at'][:16]})"] = saved["id"]
+
+for error in store_errors:
+    st.sidebar.error(f"❌ Saved reports are unavailable: {error}")
+
+opened_report = st.sidebar.selectbox("Open saved report", list(saved_reports))
+
+if saved_reports[opened_report] is not None:
+    try:
+        render_saved_report(saved_reports[opened_report])
+    except Exception as exc:
+        # Snapshot parts are read lazily while rendering
+        st.error(f"❌ Could not render this report: {type(exc).__name__}: {exc}")
+    st.stop()
+
 # --------------------------------------------------
 # File Upload
 # --------------------------------------------------
@@ -41,40 +146,42 @@ if not (sales_file and customers_file and products_file):
     st.stop()
 
 # --------------------------------------------------
-# Load & Merge Data
+# Result Cache (shared by all sessions on this server)
 # --------------------------------------------------
-sales = pd.read_csv(sales_file)
-customers = pd.read_csv(customers_file)
-products = pd.read_csv(products_file)
+@st.cache_resource
+def get_result_cache():
+    return ResultCache(
+        max_bytes=CONFIG["cache_max_mb"] * 1024 * 1024,
+        max_entries=CONFIG["cache_max_entries"],
+    )
 
-df = (
-    sales
-    .merge(customers, on="customer_id", how="left")
-    .merge(products, on="product_id", how="left")
-)
 
-df["order_date"] = pd.to_datetime(df.get("order_date"), errors="coerce")
+cache = get_result_cache()
 
-# --------------------------------------------------
-# SCHEMA NORMALIZATION
-# --------------------------------------------------
+# Per-rerun stage timings, shown in the profile panel
+profiler = Profiler(track_memory=CONFIG["profile_memory"])
 
-# ---- CATEGORY ----
-if "category" not in df.columns:
-    st.error("❌ Required column `category` not found.")
-    st.stop()
 
-# ---- REGION (DERIVE IF MISSING) ----
-if "region" not in df.columns:
-    if "country" in df.columns:
-        df["region"] = df["country"]
-        st.info("ℹ️ Region not found. Using `country`.")
-    elif "city" in df.columns:
-        df["region"] = df["city"]
-        st.info("ℹ️ Region not found. Using `city`.")
-    else:
-        df["region"] = "Unknown"
-        st.warning("⚠ No geographic column found. Using `Unknown`.")
+def cached_stage(name, key, compute, rows_in=None):
+    """
+    Run a pipeline stage through the result cache, recording its
+    timing and whether it was a cache hit.
+    """
+    with profiler.stage(name, rows_in=rows_in) as stage:
+        computed = []
+
+        def run():
+            computed.append(True)
+            return compute()
+
+        value = cache.get_or_compute(key, run)
+        stage["cache"] = "miss" if computed else "hit"
+
+    return value
+
+# --------------------------------------------------
+# Load, Merge & Normalize Data
+# --------------------------------------------------
 
 # ---- CUSTOMER NAME NORMALIZATION ----
 def find_customer_name_column(df):
@@ -90,114 +197,275 @@ def find_customer_name_column(df):
             return col
     return None
 
-customer_name_col = find_customer_name_column(df)
 
-if customer_name_col is None:
-    df["customer_name"] = "Unknown Customer"
-    st.warning("⚠ No customer name column found. Using 'Unknown Customer'.")
-else:
-    if customer_name_col != "customer_name":
-        df = df.rename(columns={customer_name_col: "customer_name"})
+def normalize_uploads(sales_file, customers_file, products_file):
+    """
+    Load, merge and schema-normalize the uploads.
+    Returns the merged frame and (level, message) notices to display.
+    """
+    notices = []
+
+    # Parsed uploads are cached in columnar form, keyed by content hash
+    data = load_cached_data(
+        {"sales": sales_file, "customers": customers_file, "products": products_file},
+        columns=None,
+    )
+
+    df = (
+        data["sales"]
+        .merge(data["customers"], on="customer_id", how="left")
+        .merge(data["products"], on="product_id", how="left")
+    )
 
-# ---- REVENUE NORMALIZATION ----
-if "price" not in df.columns:
-    if "unit_price" in df.columns:
-        df["price"] = df["unit_price"]
+    # Dates are parsed once here; day/week/month codes travel with the frame
+    if "order_date" not in df.columns:
+        df["order_date"] = pd.NaT
+    df = add_date_codes(df)
+
+    # ---- CATEGORY ----
+    if "category" not in df.columns:
+        notices.append(("error", "❌ Required column `category` not found."))
+        return None, notices
+
+    # ---- REGION (DERIVE IF MISSING) ----
+    if "region" not in df.columns:
+        if "country" in df.columns:
+            df["region"] = df["country"]
+            notices.append(("info", "ℹ️ Region not found. Using `country`."))
+        elif "city" in df.columns:
+            df["region"] = df["city"]
+            notices.append(("info", "ℹ️ Region not found. Using `city`."))
+        else:
+            df["region"] = "Unknown"
+            notices.append(("warning", "⚠ No geographic column found. Using `Unknown`."))
+
+    # ---- CUSTOMER NAME ----
+    customer_name_col = find_customer_name_column(df)
+
+    if customer_name_col is None:
+        df["customer_name"] = "Unknown Customer"
+        notices.append(("warning", "⚠ No customer name column found. Using 'Unknown Customer'."))
     else:
-        df["price"] = 0
+        if customer_name_col != "customer_name":
+            df = df.rename(columns={customer_name_col: "customer_name"})
 
-if "quantity" not in df.columns:
-    df["quantity"] = 1
+    # ---- REVENUE NORMALIZATION ----
+    if "price" not in df.columns:
+        if "unit_price" in df.columns:
+            df["price"] = df["unit_price"]
+        else:
+            df["price"] = 0
 
-if "total_amount" in df.columns:
-    df["revenue"] = df["total_amount"]
-else:
-    df["revenue"] = df["quantity"] * df["price"]
+    if "quantity" not in df.columns:
+        df["quantity"] = 1
+
+    if "total_amount" in df.columns:
+        df["revenue"] = df["total_amount"]
+    else:
+        df["revenue"] = df["quantity"] * df["price"]
+
+    # Fallback columns (country/city/'Unknown' ...) become categoricals too
+    return to_categorical(df), notices
+
+
+data_key = tuple(
+    content_hash(upload) for upload in (sales_file, customers_file, products_file)
+)
+
+df, notices = cached_stage(
+    "normalize",
+    ("normalized", data_key),
+    lambda: normalize_uploads(sales_file, customers_file, products_file),
+)
+
+for level, message in notices:
+    getattr(st, level)(message)
+
+if df is None:
+    st.stop()
+
+# Pre-aggregated (region, category, day) cube answers every filter
+cube = cached_stage("build_cube", ("cube", data_key), lambda: build_cube(df), rows_in=len(df))
 
 # --------------------------------------------------
 # Filters
 # --------------------------------------------------
 st.sidebar.header("🎛️ Filters")
 
-regions = ["All"] + sorted(df["region"].dropna().unique().tolist())
-categories = ["All"] + sorted(df["category"].dropna().unique().tolist())
+regions = ["All"] + sorted(cube["region"].dropna().unique().tolist())
+categories = ["All"] + sorted(cube["category"].dropna().unique().tolist())
 
 selected_region = st.sidebar.selectbox("Region", regions)
 selected_category = st.sidebar.selectbox("Category", categories)
 
-min_date = df["order_date"].min()
-max_date = df["order_date"].max()
+min_date = cube["day"].min()
+max_date = cube["day"].max()
 
 date_range = st.sidebar.date_input(
     "Order Date Range",
     [min_date, max_date]
 )
 
-# --------------------------------------------------
-# Apply Filters
-# --------------------------------------------------
-filtered_df = df.copy()
+# Sidebar label → CONFIG['date_freq'] value
+GRAIN_OPTIONS = {"Day": "D", "Week": "W", "Month": "ME", "Quarter": "QE", "Year": "YE"}
+default_grain = [freq_unit(freq) for freq in GRAIN_OPTIONS.values()].index(
+    freq_unit(CONFIG["date_freq"])
+)
+selected_grain = st.sidebar.selectbox("Time Grain", list(GRAIN_OPTIONS), index=default_grain)
+
+# Row-level data is only touched for drill-down and export
+drill_down = st.sidebar.checkbox("🔍 Load row-level data (drill-down & export)")
+approximate = st.sidebar.checkbox("≈ Approximate analytics (sketches)")
+show_profile = st.sidebar.checkbox("⏱️ Show pipeline profile")
+
+filter_key = (
+    data_key,
+    selected_region,
+    selected_category,
+    str(date_range[0]),
+    str(date_range[1]),
+)
+grain_key = (filter_key, GRAIN_OPTIONS[selected_grain])
 
-if selected_region != "All":
-    filtered_df = filtered_df[filtered_df["region"] == selected_region]
 
-if selected_category != "All":
-    filtered_df = filtered_df[filtered_df["category"] == selected_category]
+def filter_rows(df):
+    """
+    Row-level slice for drill-down and export only.
+    Cached frames are shared read-only, so filters build new frames.
+    """
+    filtered_df = df
 
-filtered_df = filtered_df[
-    (filtered_df["order_date"] >= pd.to_datetime(date_range[0])) &
-    (filtered_df["order_date"] <= pd.to_datetime(date_range[1]))
-]
+    if selected_region != "All":
+        filtered_df = filtered_df[filtered_df["region"] == selected_region]
 
-# --------------------------------------------------
-# Run Analytics Engine
-# --------------------------------------------------
-results = run_engine(
-    {
-        "sales": filtered_df[
+    if selected_category != "All":
+        filtered_df = filtered_df[filtered_df["category"] == selected_category]
+
+    return filtered_df[
+        (filtered_df["order_date"] >= pd.to_datetime(date_range[0])) &
+        (filtered_df["order_date"] < pd.to_datetime(date_range[1]) + pd.Timedelta(days=1))
+    ]
+
+
+def engine_inputs(rows):
+    """
+    Split normalized rows back into the tables run_engine expects.
+    Optional columns (e.g. signup_date) are kept only when uploaded.
+    """
+    def present(columns):
+        return rows[[column for column in columns if column in rows.columns]]
+
+    return {
+        "sales": present(
             ["order_id", "order_date", "customer_id", "product_id", "quantity", "price"]
-        ],
-        "customers": filtered_df[
+        ),
+        "customers": present(
             ["customer_id", "customer_name", "region", "signup_date"]
-        ].rename(columns={"customer_name": "name"}).drop_duplicates(),
-        "products": filtered_df[
+        ).rename(columns={"customer_name": "name"}).drop_duplicates(),
+        "products": present(
             ["product_id", "product_name", "category"]
-        ].drop_duplicates(),
-    },
-    CONFIG
-)
+        ).drop_duplicates(),
+    }
+
 
 # --------------------------------------------------
-# Executive Decision Engine
+# Run Analytics Engine (from the cube)
 # --------------------------------------------------
-executive = executive_decision_engine(
-    filtered_df,
-    results["monthly_sales"],
-    results["growth"]
+with profiler.stage("slice_cube", rows_in=len(cube)) as stage:
+    cells = slice_cube(
+        cube,
+        region=selected_region,
+        category=selected_category,
+        start=date_range[0],
+        end=date_range[1],
+    )
+    stage["rows_out"] = len(cells)
+
+if cells.empty:
+    st.warning("⚠ No sales match the selected filters.")
+    st.stop()
+
+results = cached_stage(
+    "engine",
+    ("engine", filter_key),
+    lambda: results_from_rollups(cube_rollups(cells), CONFIG),
+)
+
+# Another grain is re-cut from the results' time hierarchy, no rescan
+results = cached_stage(
+    "grain",
+    ("grain", grain_key),
+    lambda: results_at_grain(results, GRAIN_OPTIONS[selected_grain], CONFIG),
 )
+
 # --------------------------------------------------
-# ADVANCED FORECASTING & ALERTS
+# Background Stages (decisions, forecasting)
 # --------------------------------------------------
-forecast_df, model_used = smart_forecast(results["monthly_sales"])
-alerts = generate_alerts(results["monthly_sales"], forecast_df)
+# Both only need the engine results, so they run concurrently while the
+# page renders; their sections fill in as each one finishes.
+@st.cache_resource
+def get_executor():
+    return ThreadPoolExecutor(max_workers=CONFIG["ui_workers"])
+
 
+executor = get_executor()
+
+decisions_future = executor.submit(
+    cached_stage,
+    "decisions",
+    ("decisions", grain_key),
+    lambda: executive_decision_engine(
+        None,
+        results["monthly_sales"],
+        results["growth"],
+        rollups=results["rollups"],
+    ),
+)
+forecast_future = executor.submit(
+    cached_stage,
+    "forecast",
+    ("forecast", grain_key),
+    lambda: smart_forecast(results["monthly_sales"]),
+)
+
+# --------------------------------------------------
+# ADVANCED FORECASTING & ALERTS (filled in when ready)
+# --------------------------------------------------
 st.markdown("---")
 st.subheader("🔮 Sales Forecast & Alerts")
+forecast_slot = st.empty()
+forecast_slot.info("⏳ Forecasting in the background…")
 
-st.caption(f"Forecasting model used: **{model_used}**")
 
-st.line_chart(
-    pd.concat(
-        [
-            results["monthly_sales"].rename("Actual"),
-            forecast_df["forecast"].rename("Forecast"),
-        ],
-        axis=1,
-    )
-)
+def render_forecast(forecast):
+    forecast_df, model_used = forecast
+
+    with profiler.stage("alerts"):
+        alerts = generate_alerts(results["monthly_sales"], forecast_df, results["grain"])
+
+    with forecast_slot.container():
+        st.caption(f"Forecasting model used: **{model_used}**")
+
+        for alert in alerts:
+            if alert.startswith("🚨"):
+                st.error(alert)
+            elif alert.startswith("⚠"):
+                st.warning(alert)
+            else:
+                st.success(alert)
+
+        st.line_chart(
+            pd.concat(
+                [
+                    results["monthly_sales"].rename("Actual"),
+                    forecast_df["forecast"].rename("Forecast"),
+                ],
+                axis=1,
+            )
+        )
 
-with st.expander("📊 Forecast Details"):
-    st.dataframe(forecast_df)
+        with st.expander("📊 Forecast Details"):
+            st.dataframe(forecast_df)
 
 # --------------------------------------------------
 # KPIs
@@ -217,6 +485,52 @@ context = f"(Region: {selected_region}, Category: {selected_category})"
 for insight in results["insights"]:
     st.success(f"{insight} {context}")
 
+# --------------------------------------------------
+# Approximate Analytics (answered from per-month sketches)
+# --------------------------------------------------
+if approximate:
+    st.subheader("≈ Approximate Analytics")
+
+    sketches = cached_stage(
+        "build_sketches", ("sketches", data_key), lambda: build_sketches(df), rows_in=len(df)
+    )
+    approx = cached_stage(
+        "approximate_kpis",
+        ("approximate", filter_key),
+        lambda: approximate_kpis(
+            sketches,
+            region=selected_region,
+            category=selected_category,
+            start=date_range[0],
+            end=date_range[1],
+            top_n=CONFIG["top_n"],
+        ),
+    )
+
+    if approx is None:
+        st.info("No sketches match the selected filters.")
+    else:
+        st.caption("Dates are applied by whole month. Bounds: ± one standard error "
+                   "(distinct counts), ± rank error (percentiles), + max overestimate (revenue).")
+
+        estimate, error = approx["unique_customers"]
+        c1, c2 = st.columns(2)
+        c1.metric("Unique Customers", f"≈ {estimate:,.0f} ± {error:,.0f}")
+        c2.metric(
+            "Median Order Value",
+            f"≈ {approx['order_value_quantiles']['value'].iloc[0]:,.2f}",
+            f"± {approx['order_value_quantiles']['rank_error'].iloc[0]:.1%} rank",
+            delta_color="off",
+        )
+
+        st.line_chart(approx["unique_customers_by_month"]["estimate"].rename("Unique customers"))
+
+        c1, c2 = st.columns(2)
+        c1.markdown("**Order value percentiles**")
+        c1.dataframe(approx["order_value_quantiles"])
+        c2.markdown("**Heavy-hitter products (revenue)**")
+        c2.dataframe(approx["heavy_hitters"])
+
 # --------------------------------------------------
 # Export Section
 # --------------------------------------------------
@@ -224,13 +538,35 @@ st.subheader("📤 Export Reports")
 
 col1, col2, col3 = st.columns(3)
 
+FORMAT_LABELS = {"csv": "CSV", "csv.gz": "CSV (gzip)", "parquet": "Parquet"}
+
+
+def export_filtered(fmt):
+    """
+    Filtered rows (without the internal date code columns), written in
+    chunks to a spooled temp file. Streamlit keeps download payloads as
+    bytes, so the file is read once, here, with no text copy alongside.
+    """
+    rows = filter_rows(df).drop(columns=list(CODE_COLUMNS.values()), errors="ignore")
+    with export_frame(rows, fmt) as handle:
+        return handle.read()
+
+
 with col1:
-    st.download_button(
-        "⬇️ Filtered Data (CSV)",
-        data=filtered_df.to_csv(index=False).encode("utf-8"),
-        file_name="filtered_sales_data.csv",
-        mime="text/csv",
-    )
+    if drill_down:
+        export_format = st.selectbox(
+            "Export format", available_formats(), format_func=FORMAT_LABELS.get
+        )
+        extension, mime = EXPORT_FORMATS[export_format]
+        st.download_button(
+            f"⬇️ Filtered Data ({FORMAT_LABELS[export_format]})",
+            # Built only when clicked, off the page script's thread
+            data=lambda: export_filtered(export_format),
+            file_name=f"filtered_sales_data{extension}",
+            mime=mime,
+        )
+    else:
+        st.caption("Enable row-level data in the sidebar to export filtered rows.")
 
 with col2:
     kpi_payload = {
@@ -253,30 +589,44 @@ with col3:
     )
 
 # --------------------------------------------------
-# Executive Summary
+# Executive Summary (filled in when ready)
 # --------------------------------------------------
 st.markdown("---")
 st.subheader("🧠 Executive Decision Summary")
+executive_slot = st.empty()
+executive_slot.info("⏳ Evaluating business health in the background…")
+
+
+def render_executive(executive):
+    with executive_slot.container():
+        health = executive["health_score"]
+
+        if health >= 75:
+            st.success(f"🟢 Business Health: {health}/100 (Strong)")
+        elif health >= 50:
+            st.warning(f"🟡 Business Health: {health}/100 (Moderate)")
+        else:
+            st.error(f"🔴 Business Health: {health}/100 (At Risk)")
 
-health = executive["health_score"]
+        st.markdown("### ⚠ Risks")
+        if executive["risks"]:
+            for r in executive["risks"]:
+                st.warning(r)
+        else:
+            st.success("No major risks detected.")
 
-if health >= 75:
-    st.success(f"🟢 Business Health: {health}/100 (Strong)")
-elif health >= 50:
-    st.warning(f"🟡 Business Health: {health}/100 (Moderate)")
-else:
-    st.error(f"🔴 Business Health: {health}/100 (At Risk)")
+        st.markdown("### 💡 Recommendations")
+        for rec in executive["recommendations"]:
+            st.info(rec)
 
-st.markdown("### ⚠ Risks")
-if executive["risks"]:
-    for r in executive["risks"]:
-        st.warning(r)
-else:
-    st.success("No major risks detected.")
 
-st.markdown("### 💡 Recommendations")
-for rec in executive["recommendations"]:
-    st.info(rec)
+# Render each background section as soon as its stage finishes
+renderers = {forecast_future: render_forecast, decisions_future: render_executive}
+for future in as_completed(renderers):
+    renderers[future](future.result())
+
+executive = decisions_future.result()
+forecast_df, model_used = forecast_future.result()
 
 
 # --------------------------------------------------
@@ -293,7 +643,8 @@ if st.button("💾 Save Report"):
         "filters": {
             "region": selected_region,
             "category": selected_category,
-            "date_range": [str(date_range[0]), str(date_range[1])]
+            "date_range": [str(date_range[0]), str(date_range[1])],
+            "grain": selected_grain,
         },
         "kpis": {
             "total_revenue": float(results["kpis"]["total_revenue"]),
@@ -303,13 +654,33 @@ if st.button("💾 Save Report"):
         "insights": results["insights"]
     }
 
-    save_report(report_payload)
-    st.success("✅ Report saved successfully!")
+    try:
+        # Rankings need row-level data; computed only when saving
+        detailed = run_engine(engine_inputs(filter_rows(df)), CONFIG)
+
+        snapshot = snapshot_from_results(results, executive, forecast_df, model_used)
+        snapshot["top_products"] = detailed["kpis"]["top_products"]
+        snapshot["top_customers"] = detailed["kpis"]["top_customers"]
+
+        save_report(report_payload, snapshot=snapshot)
+        st.success("✅ Report saved successfully!")
+    except Exception as exc:
+        st.error(f"❌ Could not save the report: {type(exc).__name__}: {exc}")
 
 
 
 # --------------------------------------------------
 # Data Preview
 # --------------------------------------------------
-with st.expander("🔍 View Filtered Data"):
-    st.dataframe(filtered_df)
+if drill_down:
+    with st.expander("🔍 View Filtered Data"):
+        st.dataframe(filter_rows(df))
+
+# --------------------------------------------------
+# Pipeline Profile
+# --------------------------------------------------
+if show_profile:
+    st.markdown("---")
+    st.subheader("⏱️ Pipeline Profile")
+    st.dataframe(pd.DataFrame(profiler.report()))
+    st.caption(f"Result cache: {cache.stats()}")